@@ -0,0 +1,37 @@
+"""drop change sequence counter
+
+Revision ID: a9c3e7f2d4b8
+Revises: e5f1a3c7b9d2
+Create Date: 2026-10-17 16:05:41.204118
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e7f2d4b8'
+down_revision: Union[str, Sequence[str], None] = 'e5f1a3c7b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Writes now take MAX(orders.change_seq) + 1 inside their own statement
+    op.drop_table('change_sequence')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('change_sequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        "INSERT INTO change_sequence (id, value) "
+        "SELECT 1, COALESCE(MAX(change_seq), 0) FROM orders"
+    )
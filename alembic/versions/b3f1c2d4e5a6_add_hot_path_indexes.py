@@ -0,0 +1,31 @@
+"""add hot path indexes
+
+Revision ID: b3f1c2d4e5a6
+Revises: 7fa7aa178b1f
+Create Date: 2026-10-17 10:12:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, Sequence[str], None] = '7fa7aa178b1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_orders_user_id_status_id', 'orders', ['user_id', 'status', 'id'],
+        unique=False
+    )
+    op.create_index('ix_order_item_order_id', 'order_item', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_item_order_id', table_name='order_item')
+    op.drop_index('ix_orders_user_id_status_id', table_name='orders')
@@ -0,0 +1,32 @@
+"""add order version
+
+Revision ID: b6d2f8a4c1e7
+Revises: a9c3e7f2d4b8
+Create Date: 2026-10-17 18:41:27.530862
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f8a4c1e7'
+down_revision: Union[str, Sequence[str], None] = 'a9c3e7f2d4b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'orders',
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,57 @@
+"""store prices as integer cents
+
+Revision ID: c4a7d9e2f1b3
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-17 11:40:27.530914
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7d9e2f1b3'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('price_cents', sa.Integer(), nullable=True))
+    op.add_column(
+        'order_item', sa.Column('unit_price_cents', sa.Integer(), nullable=True)
+    )
+
+    # Convert existing decimal values, then recompute totals from the items so
+    # any float rounding error accumulated in orders.price is discarded.
+    op.execute(
+        "UPDATE order_item SET unit_price_cents = "
+        "CAST(ROUND(COALESCE(unit_price, 0) * 100) AS INTEGER)"
+    )
+    op.execute(
+        "UPDATE orders SET price_cents = ("
+        "SELECT COALESCE(SUM(order_item.amount * order_item.unit_price_cents), 0) "
+        "FROM order_item WHERE order_item.order_id = orders.id)"
+    )
+
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.drop_column('unit_price')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('price')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('orders', sa.Column('price', sa.Float(), nullable=True))
+    op.add_column('order_item', sa.Column('unit_price', sa.Float(), nullable=True))
+
+    op.execute("UPDATE order_item SET unit_price = unit_price_cents / 100.0")
+    op.execute("UPDATE orders SET price = price_cents / 100.0")
+
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.drop_column('unit_price_cents')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('price_cents')
@@ -0,0 +1,49 @@
+"""add sales rollups
+
+Revision ID: d8e2b6a1c9f4
+Revises: c4a7d9e2f1b3
+Create Date: 2026-10-17 13:05:51.207846
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e2b6a1c9f4'
+down_revision: Union[str, Sequence[str], None] = 'c4a7d9e2f1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    op.create_table('sales_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status')
+    )
+    op.create_table('sales_daily_item',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('flavor', sa.String(), nullable=False),
+    sa.Column('size', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue_cents', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status', 'flavor', 'size')
+    )
+    # Rollups start empty: existing orders have no closed_at, so
+    # `python -m src.cli rebuild-sales` only counts orders closed from now on.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sales_daily_item')
+    op.drop_table('sales_daily')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('closed_at')
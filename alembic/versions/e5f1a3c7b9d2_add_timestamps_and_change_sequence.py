@@ -0,0 +1,102 @@
+"""add timestamps and change sequence
+
+Revision ID: e5f1a3c7b9d2
+Revises: d8e2b6a1c9f4
+Create Date: 2026-10-17 14:22:09.613457
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1a3c7b9d2'
+down_revision: Union[str, Sequence[str], None] = 'd8e2b6a1c9f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('orders', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('orders', sa.Column('change_seq', sa.Integer(), nullable=True))
+    op.add_column('order_item', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('order_item', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # The real creation times are unknown: closed orders use their closing time,
+    # the rest the migration time. Existing orders are sequenced by id.
+    op.execute(
+        "UPDATE orders SET created_at = COALESCE(closed_at, CURRENT_TIMESTAMP), "
+        "updated_at = COALESCE(closed_at, CURRENT_TIMESTAMP), change_seq = id"
+    )
+    op.execute(
+        "UPDATE order_item SET "
+        "created_at = (SELECT orders.created_at FROM orders "
+        "WHERE orders.id = order_item.order_id), "
+        "updated_at = (SELECT orders.created_at FROM orders "
+        "WHERE orders.id = order_item.order_id)"
+    )
+
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('change_seq', existing_type=sa.Integer(), nullable=False)
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_orders_change_seq', 'orders', ['change_seq'], unique=False)
+    op.create_index(
+        'ix_orders_user_id_change_seq', 'orders', ['user_id', 'change_seq'],
+        unique=False
+    )
+
+    op.create_table('change_sequence',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        "INSERT INTO change_sequence (id, value) "
+        "SELECT 1, COALESCE(MAX(id), 0) FROM orders"
+    )
+
+    op.create_table('order_item_tombstones',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('change_seq', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.PrimaryKeyConstraint('item_id')
+    )
+    op.create_index(
+        'ix_order_item_tombstones_change_seq', 'order_item_tombstones',
+        ['change_seq'], unique=False
+    )
+    op.create_index(
+        'ix_order_item_tombstones_order_id', 'order_item_tombstones',
+        ['order_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_order_item_tombstones_order_id', table_name='order_item_tombstones'
+    )
+    op.drop_index(
+        'ix_order_item_tombstones_change_seq', table_name='order_item_tombstones'
+    )
+    op.drop_table('order_item_tombstones')
+    op.drop_table('change_sequence')
+    op.drop_index('ix_orders_user_id_change_seq', table_name='orders')
+    op.drop_index('ix_orders_change_seq', table_name='orders')
+    with op.batch_alter_table('order_item') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('change_seq')
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('created_at')
@@ -0,0 +1,140 @@
+"""
+Measure list/detail query latency on a large SQLite dataset before and after
+the hot-path indexes from migration b3f1c2d4e5a6.
+
+Usage:
+    python -m benchmarks.index_benchmark --orders 100000 --items-per-order 3
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+
+from src.infrastructure.db.models import Base, Order, OrderItem, User
+
+STATUSES = ["PENDING", "FINISHED", "CANCELED"]
+INDEXES = [
+    "CREATE INDEX ix_orders_user_id_status_id ON orders (user_id, status, id)",
+    "CREATE INDEX ix_order_item_order_id ON order_item (order_id)",
+]
+
+
+def seed(engine, users: int, orders: int, items_per_order: int) -> None:
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "name": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "x",
+                "active": True,
+                "admin": False
+            }
+            for i in range(users)
+        ])
+        conn.execute(insert(Order), [
+            {
+                "user_id": rng.randint(1, users),
+                "status": rng.choice(STATUSES),
+                "price_cents": 0
+            }
+            for _ in range(orders)
+        ])
+        conn.execute(insert(OrderItem), [
+            {
+                "order_id": order_id,
+                "amount": 1,
+                "flavor": "Calabresa",
+                "size": "Grande",
+                "unit_price_cents": 4500
+            }
+            for order_id in range(1, orders + 1)
+            for _ in range(items_per_order)
+        ])
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+def run_queries(engine, users: int, orders: int, repeat: int) -> dict:
+    rng = random.Random(7)
+
+    def list_page():
+        # Same filter and order as AsyncSQLAlchemyOrderReadRepository.get_page
+        with engine.connect() as conn:
+            ids = conn.scalars(
+                select(Order.id)
+                .where(
+                    Order.user_id == rng.randint(1, users),
+                    Order.status == "PENDING"
+                )
+                .order_by(Order.id.desc())
+                .limit(51)
+            ).all()
+            conn.execute(select(OrderItem).where(OrderItem.order_id.in_(ids))).all()
+
+    def detail():
+        with engine.connect() as conn:
+            order_id = rng.randint(1, orders)
+            conn.execute(select(Order).where(Order.id == order_id)).one()
+            conn.execute(select(OrderItem).where(OrderItem.order_id == order_id)).all()
+
+    return {"list": timed(list_page, repeat), "detail": timed(detail, repeat)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        # Build the tables without the new indexes to measure the "before" state
+        for table in Base.metadata.sorted_tables:
+            table.create(engine)
+            for index in list(table.indexes):
+                index.drop(engine)
+        seed(engine, args.users, args.orders, args.items_per_order)
+
+        before = run_queries(engine, args.users, args.orders, args.repeat)
+        with engine.begin() as conn:
+            for ddl in INDEXES:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql("ANALYZE")
+        after = run_queries(engine, args.users, args.orders, args.repeat)
+        engine.dispose()
+
+    items = args.orders * args.items_per_order
+    print(f"{args.orders} orders, {items} items, {args.repeat} runs (ms)")
+    print(
+        f"{'query':<8}{'before p50':>12}{'before p95':>12}"
+        f"{'after p50':>12}{'after p95':>12}"
+    )
+    for name in ("list", "detail"):
+        print(
+            f"{name:<8}{before[name]['p50']:>12.3f}{before[name]['p95']:>12.3f}"
+            f"{after[name]['p50']:>12.3f}{after[name]['p95']:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
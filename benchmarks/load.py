@@ -0,0 +1,333 @@
+"""
+Drive the real API in-process with concurrent virtual users and report
+per-endpoint latency percentiles and throughput.
+
+Each virtual user repeats a realistic session against src.main:app through an
+ASGI client: login, list own orders, create an order, add items one by one and
+in a batch, read it back and finalize it. The app runs on a seeded temporary
+SQLite database, so no server or network is involved.
+
+Usage:
+    python -m benchmarks.load --concurrency 20 --duration 15
+    python -m benchmarks.load --save-baseline baseline.json
+    python -m benchmarks.load --compare baseline.json --threshold 0.2
+
+With --compare the exit code is 1 when any endpoint's p95 grew, or its
+requests/sec dropped, by more than the threshold fraction.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+FLAVORS = ["Calabresa", "Mussarela", "Portuguesa", "Frango", "Marguerita"]
+SIZES = ["Pequena", "Media", "Grande"]
+STATUSES = ["PENDING", "FINISHED", "CANCELED"]
+PASSWORD = "benchmark"
+
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def seed(engine, users: int, orders: int, items_per_order: int) -> None:
+    from sqlalchemy import insert
+
+    from src.infrastructure.db.models import Order, OrderItem, User
+    from src.infrastructure.security import hash_password
+
+    rng = random.Random(42)
+    password = hash_password(PASSWORD)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {
+                "name": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": password,
+                "active": True,
+                "admin": False
+            }
+            for i in range(users)
+        ])
+        items = [
+            [
+                {
+                    "amount": rng.randint(1, 3),
+                    "flavor": rng.choice(FLAVORS),
+                    "size": rng.choice(SIZES),
+                    "unit_price_cents": rng.choice([2990, 3990, 4990])
+                }
+                for _ in range(items_per_order)
+            ]
+            for _ in range(orders)
+        ]
+        conn.execute(insert(Order), [
+            {
+                "user_id": rng.randint(1, users),
+                "status": rng.choice(STATUSES),
+                "price_cents": sum(
+                    item["amount"] * item["unit_price_cents"] for item in order_items
+                ),
+                "change_seq": order_id,
+            }
+            for order_id, order_items in enumerate(items, start=1)
+        ])
+        conn.execute(insert(OrderItem), [
+            {**item, "order_id": order_id}
+            for order_id, order_items in enumerate(items, start=1)
+            for item in order_items
+        ])
+        conn.exec_driver_sql("ANALYZE")
+
+
+class Recorder:
+    """
+    Collects latency samples (ms) and failures per endpoint label.
+    """
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, label: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples[label].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for label, samples in sorted(self.samples.items()):
+            samples.sort()
+            endpoints[label] = {
+                "requests": len(samples),
+                "errors": self.errors[label],
+                "rps": len(samples) / elapsed,
+                "p50": percentile(samples, 50),
+                "p95": percentile(samples, 95),
+                "p99": percentile(samples, 99),
+            }
+        return endpoints
+
+
+async def virtual_user(
+    client,
+    recorder: Recorder,
+    rng: random.Random,
+    users: int,
+    deadline: float
+) -> None:
+    while time.perf_counter() < deadline:
+        email = f"user{rng.randrange(users)}@example.com"
+        res = await recorder.call(
+            client, "POST /auth/login", "POST", "/auth/login",
+            json={"email": email, "password": PASSWORD}
+        )
+        if res.status_code != 200:
+            continue
+        headers = {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+        await recorder.call(
+            client, "GET /order/", "GET", "/order/",
+            params={"limit": 20}, headers=headers
+        )
+        res = await recorder.call(
+            client, "POST /order/", "POST", "/order/", headers=headers
+        )
+        if res.status_code != 201:
+            continue
+        order_id = int(res.json()["Message"].split()[-1])
+        url = f"/order/{order_id}"
+
+        for _ in range(rng.randint(1, 3)):
+            item = {
+                "amount": rng.randint(1, 3),
+                "flavor": rng.choice(FLAVORS),
+                "size": rng.choice(SIZES),
+                "unit_price_cents": 4990
+            }
+            await recorder.call(
+                client, "POST /order/{id}/items", "POST", f"{url}/items",
+                json=item, headers=headers
+            )
+        batch = [
+            {
+                "amount": 1,
+                "flavor": rng.choice(FLAVORS),
+                "size": rng.choice(SIZES),
+                "unit_price_cents": 3990
+            }
+            for _ in range(rng.randint(2, 5))
+        ]
+        await recorder.call(
+            client, "POST /order/{id}/items/batch", "POST", f"{url}/items/batch",
+            json=batch, headers=headers
+        )
+        await recorder.call(client, "GET /order/{id}", "GET", url, headers=headers)
+        await recorder.call(
+            client, "POST /order/{id}/finish", "POST", f"{url}/finish",
+            headers=headers
+        )
+
+
+async def run_load(app, args) -> tuple[dict, float]:
+    import httpx
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+    async with client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            virtual_user(
+                client, recorder, random.Random(args.seed + i), args.users, deadline
+            )
+            for i in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    return recorder.report(elapsed), elapsed
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Return a description of every endpoint that regressed beyond `threshold`.
+    """
+    regressions = []
+    for label, base in baseline["endpoints"].items():
+        now = current["endpoints"].get(label)
+        if now is None:
+            regressions.append(f"{label}: missing from this run")
+            continue
+        if now["p95"] > base["p95"] * (1 + threshold):
+            regressions.append(
+                f"{label}: p95 {base['p95']:.2f}ms -> {now['p95']:.2f}ms"
+            )
+        if now["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{label}: rps {base['rps']:.1f} -> {now['rps']:.1f}")
+    return regressions
+
+
+def print_report(result: dict) -> None:
+    config = result["config"]
+    print(
+        f"{config['concurrency']} virtual users for {result['elapsed']:.1f}s on "
+        f"{config['orders']} orders / {config['users']} users (latency in ms)"
+    )
+    print(
+        f"{'endpoint':<30}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50':>10}{'p95':>10}{'p99':>10}"
+    )
+    for label, stats in result["endpoints"].items():
+        print(
+            f"{label:<30}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['rps']:>10.1f}"
+            f"{stats['p50']:>10.2f}{stats['p95']:>10.2f}{stats['p99']:>10.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=20_000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--bcrypt-rounds", type=int,
+        help="Override BCRYPT_ROUNDS; login cost dominates otherwise"
+    )
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Allowed regression as a fraction"
+    )
+    args = parser.parse_args()
+
+    if args.bcrypt_rounds is not None:
+        # Settings are read on first import, so this must precede any src import
+        os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.dependencies import get_session_factory
+    from src.infrastructure.db.database import Base, configure_sqlite_engine
+    from src.infrastructure.security import shutdown_hash_executor
+    from src.main import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.db")
+        engine = create_engine(f"sqlite:///{path}")
+        configure_sqlite_engine(engine)
+        Base.metadata.create_all(engine)
+        seed(engine, args.users, args.orders, args.items_per_order)
+        engine.dispose()
+
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        configure_sqlite_engine(async_engine.sync_engine)
+        session_factory = async_sessionmaker(
+            bind=async_engine, autoflush=False, expire_on_commit=False
+        )
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+        async def run():
+            try:
+                return await run_load(app, args)
+            finally:
+                await async_engine.dispose()
+
+        endpoints, elapsed = asyncio.run(run())
+        app.dependency_overrides.clear()
+        shutdown_hash_executor()
+
+    result = {
+        "config": {
+            "users": args.users,
+            "orders": args.orders,
+            "items_per_order": args.items_per_order,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "elapsed": elapsed,
+        "endpoints": endpoints,
+    }
+    print_report(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["config"] != result["config"]:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-response cost of serializing an order with 1, 20 and 200 items: the old
+schema path (model_validate + model_dump, then jsonable_encoder and json.dumps
+in JSONResponse) against order_to_dict + FastJSONResponse.
+
+Usage:
+    python -m benchmarks.serialization --repeat 2000
+"""
+import argparse
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.domain.clock import utcnow
+from src.infrastructure.db.models import Order, OrderItem
+from src.presentation.order_io import order_to_dict
+from src.presentation.responses import FastJSONResponse, orjson
+from src.presentation.schemas import ResponseOrderSchema
+
+
+def build_order(item_count: int) -> Order:
+    now = utcnow()
+    order = Order(
+        user_id=1, id=1, created_at=now, updated_at=now, change_seq=1, version=1
+    )
+    order.items = [
+        OrderItem(
+            amount=2,
+            flavor="Calabresa",
+            size="Grande",
+            unit_price_cents=4990,
+            order=1,
+            id=i
+        )
+        for i in range(1, item_count + 1)
+    ]
+    order.price_cents = sum(item.total_cents for item in order.items)
+    return order
+
+
+def schema_path(order: Order) -> bytes:
+    body = ResponseOrderSchema.model_validate(order).model_dump()
+    content = {"message": "ok", "order": body}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_path(order: Order) -> bytes:
+    return FastJSONResponse({"message": "ok", "order": order_to_dict(order)}).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 20, 200])
+    args = parser.parse_args()
+
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"JSON encoder: {encoder}, {args.repeat} runs (µs per response)")
+    print(f"{'items':>6}{'schema':>12}{'fast':>12}{'speedup':>10}")
+    for size in args.sizes:
+        order = build_order(size)
+        results = []
+        for path in (schema_path, fast_path):
+            best = min(
+                timeit.repeat(lambda: path(order), number=args.repeat, repeat=3)
+            )
+            results.append(best / args.repeat * 1_000_000)
+        speedup = results[0] / results[1]
+        print(f"{size:>6}{results[0]:>12.1f}{results[1]:>12.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
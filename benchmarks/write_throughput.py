@@ -0,0 +1,189 @@
+"""
+Write throughput of the order mutation paths under concurrency: the
+per-request commit path (DirectWriter, one session and transaction per call)
+against the group-commit writer (GroupCommitWriter).
+
+Each worker repeatedly creates an order and adds items to it one by one,
+calling the use cases through the writer exactly as the routes do. Every mode
+runs on a fresh temporary SQLite database with the Settings PRAGMA profile;
+pass --synchronous FULL to see the effect with one fsync per commit.
+
+Usage:
+    python -m benchmarks.write_throughput --concurrency 1 10 50 --duration 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+FLAVORS = ["Calabresa", "Mussarela", "Portuguesa", "Frango", "Marguerita"]
+SIZES = ["Pequena", "Media", "Grande"]
+
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not samples:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(samples)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+async def worker(
+    writer,
+    user,
+    rng: random.Random,
+    items_per_order: int,
+    deadline: float,
+    samples: list,
+    errors: list
+) -> None:
+    async def call(operation):
+        start = time.perf_counter()
+        try:
+            result = await writer.submit(operation)
+        except Exception as exc:
+            errors.append(type(exc).__name__)
+            return None
+        samples.append((time.perf_counter() - start) * 1000)
+        return result
+
+    while time.perf_counter() < deadline:
+        order = await call(lambda orders: orders.create_order(user.id))
+        if order is None:
+            continue
+        for _ in range(items_per_order):
+            item = {
+                "amount": rng.randint(1, 3),
+                "flavor": rng.choice(FLAVORS),
+                "size": rng.choice(SIZES),
+                "unit_price_cents": 4990
+            }
+            await call(lambda orders: orders.add_item(order.id, user=user, **item))
+
+
+async def run_mode(mode: str, path: str, args, concurrency: int) -> dict:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from src.dependencies import build_order_use_case
+    from src.infrastructure.db.database import configure_sqlite_engine
+    from src.infrastructure.db.models import User
+    from src.infrastructure.db.write_queue import DirectWriter, GroupCommitWriter
+    from src.infrastructure.events import OrderEventBus
+    from src.infrastructure.metrics import db_busy_retries_total, write_batch_size
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    configure_sqlite_engine(async_engine.sync_engine)
+    session_factory = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    events = OrderEventBus(history_size=1, queue_size=1)
+    if mode == "group":
+        writer = GroupCommitWriter(
+            session_factory,
+            build_order_use_case,
+            events,
+            window=args.window_ms / 1000,
+            max_batch=args.max_batch
+        )
+    else:
+        writer = DirectWriter(session_factory, build_order_use_case, events)
+    user = User(name="bench", email="bench@example.com", password="x", admin=False)
+    user.id = 1
+
+    samples, errors = [], []
+    batches_before = write_batch_size.count()
+    operation = "group_commit" if mode == "group" else "order_write"
+    retries_before = db_busy_retries_total.value(operation)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    try:
+        await asyncio.gather(*(
+            worker(
+                writer,
+                user,
+                random.Random(args.seed + i),
+                args.items_per_order,
+                deadline,
+                samples,
+                errors
+            )
+            for i in range(concurrency)
+        ))
+    finally:
+        await async_engine.dispose()
+    elapsed = time.perf_counter() - start
+    samples.sort()
+    batches = write_batch_size.count() - batches_before
+    return {
+        "writes": len(samples),
+        "errors": len(errors),
+        "retries": int(db_busy_retries_total.value(operation) - retries_before),
+        "wps": len(samples) / elapsed,
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "per_commit": len(samples) / batches if batches else 1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument(
+        "--duration", type=float, default=5.0,
+        help="Seconds per mode and concurrency level"
+    )
+    parser.add_argument("--items-per-order", type=int, default=3)
+    parser.add_argument("--window-ms", type=float, default=0.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--synchronous", help="Override SQLITE_SYNCHRONOUS, e.g. FULL")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.synchronous:
+        # Settings are read on first import, so this must precede any src import
+        os.environ["SQLITE_SYNCHRONOUS"] = args.synchronous
+
+    from sqlalchemy import create_engine, insert
+
+    from src.config import settings
+    from src.infrastructure.db.database import Base, configure_sqlite_engine
+    from src.infrastructure.db.models import User
+
+    print(
+        f"journal_mode={settings.SQLITE_JOURNAL_MODE} "
+        f"synchronous={settings.SQLITE_SYNCHRONOUS}, "
+        f"{args.duration:.0f}s per run, window {args.window_ms}ms (latency in ms)"
+    )
+    print(
+        f"{'mode':<8}{'workers':>8}{'writes':>9}{'errors':>8}{'retries':>9}"
+        f"{'writes/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'per commit':>12}"
+    )
+    for concurrency in args.concurrency:
+        for mode in ("direct", "group"):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "writes.db")
+                engine = create_engine(f"sqlite:///{path}")
+                configure_sqlite_engine(engine)
+                Base.metadata.create_all(engine)
+                with engine.begin() as conn:
+                    conn.execute(insert(User), [
+                        {"name": "bench", "email": "bench@example.com", "password": "x"}
+                    ])
+                engine.dispose()
+                stats = asyncio.run(run_mode(mode, path, args, concurrency))
+            print(
+                f"{mode:<8}{concurrency:>8}{stats['writes']:>9}{stats['errors']:>8}"
+                f"{stats['retries']:>9}{stats['wps']:>10.1f}{stats['p50']:>9.2f}"
+                f"{stats['p95']:>9.2f}{stats['p99']:>9.2f}{stats['per_commit']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
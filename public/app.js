@@ -2,7 +2,10 @@
 let currentUser = null;
 let currentToken = null;
 let activeOrders = [];
+let nextOrdersCursor = null; // X-Next-Cursor of the last loaded page, null on the last page
 let selectedOrderId = null;
+let orderEvents = null; // EventSource on /order/events while the dashboard is open
+let orderEventsReload = null; // pending debounced reload after an order event
 
 // Pizza Default Prices based on Size
 const basePrices = {
@@ -144,6 +147,7 @@ async function handleLogin(event) {
 function handleLogout() {
   localStorage.removeItem("access_token");
   localStorage.removeItem("current_user");
+  closeOrderEvents();
   currentUser = null;
   currentToken = null;
   activeOrders = [];
@@ -167,20 +171,53 @@ function showDashboard() {
   
   // Refresh Order List
   loadOrders();
+  openOrderEvents();
+}
+
+// Reload the list when orders change elsewhere, instead of polling.
+// EventSource cannot send headers, so the token goes in the query string;
+// it reconnects by itself, sending Last-Event-ID.
+function openOrderEvents() {
+  closeOrderEvents();
+  orderEvents = new EventSource(`/order/events?access_token=${encodeURIComponent(currentToken)}`);
+  const scheduleReload = () => {
+    clearTimeout(orderEventsReload);
+    orderEventsReload = setTimeout(() => loadOrders(), 300);
+  };
+  // `reset`: events were missed while disconnected, so refetch everything
+  for (const type of ["created", "item_added", "item_deleted", "canceled", "finished", "reset"]) {
+    orderEvents.addEventListener(type, scheduleReload);
+  }
+}
+
+function closeOrderEvents() {
+  if (orderEvents) {
+    orderEvents.close();
+    orderEvents = null;
+  }
+  clearTimeout(orderEventsReload);
+  orderEventsReload = null;
 }
 
 // ==========================================================================
 // Order Management Logic
 // ==========================================================================
 
+// Fetch one page of orders (newest first); the API sends the next page's cursor in X-Next-Cursor
+async function fetchOrdersPage(cursor = null) {
+  const url = cursor === null ? "/order/" : `/order/?cursor=${encodeURIComponent(cursor)}`;
+  const response = await fetch(url, {
+    method: "GET",
+    headers: {
+      "Authorization": `Bearer ${currentToken}`
+    }
+  });
+  return { response, nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
 async function loadOrders(selectIdAfterLoad = null) {
   try {
-    const response = await fetch("/order/", {
-      method: "GET",
-      headers: {
-        "Authorization": `Bearer ${currentToken}`
-      }
-    });
+    const { response, nextCursor } = await fetchOrdersPage();
 
     if (response.status === 401) {
       handleLogout();
@@ -191,6 +228,7 @@ async function loadOrders(selectIdAfterLoad = null) {
 
     if (response.ok) {
       activeOrders = data;
+      nextOrdersCursor = nextCursor;
       
       // Determine user privilege from list_orders response
       // (FastAPI lists all orders only if admin=True)
@@ -221,6 +259,32 @@ async function loadOrders(selectIdAfterLoad = null) {
   }
 }
 
+// Append the next page of orders to the sidebar
+async function loadMoreOrders() {
+  if (nextOrdersCursor === null) return;
+  try {
+    const { response, nextCursor } = await fetchOrdersPage(nextOrdersCursor);
+
+    if (response.status === 401) {
+      handleLogout();
+      return;
+    }
+
+    const data = await response.json();
+
+    if (response.ok) {
+      activeOrders = activeOrders.concat(data);
+      nextOrdersCursor = nextCursor;
+      renderOrdersList();
+    } else {
+      showToast(data.detail || "Falha ao carregar pedidos", "error");
+    }
+  } catch (err) {
+    console.error("Load more orders error:", err);
+    showToast("Erro ao carregar pedidos", "error");
+  }
+}
+
 function renderOrdersList() {
   const container = document.getElementById("orders-list");
   
@@ -253,6 +317,14 @@ function renderOrdersList() {
       </div>
     `;
   }).join('');
+
+  if (nextOrdersCursor !== null) {
+    container.innerHTML += `
+      <button class="btn btn-secondary btn-block" onclick="loadMoreOrders()">
+        <i class="fa-solid fa-angles-down"></i> <span>Carregar mais pedidos</span>
+      </button>
+    `;
+  }
 }
 
 // Create new, empty order
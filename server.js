@@ -24,6 +24,10 @@ app.use(['/auth', '/order'], async (req, res) => {
     if (req.headers.authorization) {
       headers['authorization'] = req.headers.authorization;
     }
+    // EventSource resends the id of the last event it saw when reconnecting
+    if (req.headers['last-event-id']) {
+      headers['last-event-id'] = req.headers['last-event-id'];
+    }
 
     const options = {
       method: req.method,
@@ -55,9 +59,32 @@ app.use(['/auth', '/order'], async (req, res) => {
     if (resContentType) {
       res.setHeader('content-type', resContentType);
     }
+
+    // Pagination cursor of GET /order/
+    const nextCursor = apiResponse.headers.get('x-next-cursor');
+    if (nextCursor) {
+      res.setHeader('x-next-cursor', nextCursor);
+    }
     
     res.status(apiResponse.status);
 
+    // Server-Sent Events (GET /order/events): relay each chunk as it arrives
+    if (resContentType && resContentType.includes('text/event-stream')) {
+      res.setHeader('cache-control', 'no-cache');
+      res.flushHeaders();
+      const reader = apiResponse.body.getReader();
+      req.on('close', () => reader.cancel().catch(() => {}));
+      try {
+        for (let chunk = await reader.read(); !chunk.done; chunk = await reader.read()) {
+          res.write(chunk.value);
+        }
+      } catch (error) {
+        // Client went away or the backend dropped the stream
+      }
+      res.end();
+      return;
+    }
+
     if (resContentType && resContentType.includes('application/json')) {
       const data = await apiResponse.json();
       res.json(data);
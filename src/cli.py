@@ -0,0 +1,125 @@
+"""
+Maintenance commands for the restaurant database.
+
+Usage:
+    python -m src.cli check-totals [--fix]
+    python -m src.cli import-orders FILE [--format ndjson|csv] [--chunk-size N]
+    python -m src.cli rebuild-sales
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from src.dependencies import build_order_use_case
+from src.domain.money import from_cents
+from src.domain.use_cases import ReportUseCase
+from src.infrastructure.db.database import AsyncSessionLocal, async_engine
+from src.infrastructure.db.repositories import (
+    AsyncSQLAlchemyOrderRepository,
+    AsyncSQLAlchemySalesReportRepository,
+)
+from src.infrastructure.db.unit_of_work import AsyncSQLAlchemyUnitOfWork
+from src.presentation.order_io import iter_lines, parse_import_lines
+
+
+async def check_totals(fix: bool) -> int:
+    """
+    Report orders whose stored total differs from the sum of their items.
+    Returns the process exit code: 1 when drift was found and left unfixed.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = AsyncSQLAlchemyOrderRepository(session)
+        drift = await repo.find_price_drift()
+        for order_id, stored, computed in drift:
+            print(
+                f"order {order_id}: stored {from_cents(stored):.2f} "
+                f"!= items {from_cents(computed):.2f}"
+            )
+        print(f"{len(drift)} order(s) with drifted totals")
+        if drift and fix:
+            async with AsyncSQLAlchemyUnitOfWork(session) as uow:
+                fixed = await repo.fix_price_drift()
+                await uow.commit()
+            print(f"{fixed} order(s) fixed")
+            return 0
+    return 1 if drift else 0
+
+
+async def _read_chunks(path: str, size: int = 1 << 16):
+    with open(path, "rb") as source:
+        while chunk := source.read(size):
+            yield chunk
+
+
+async def import_orders(path: str, fmt: str, chunk_size: int) -> int:
+    """
+    Bulk import orders from an NDJSON or CSV file and print the report as JSON.
+    Returns 1 when any row was rejected.
+    """
+    async with AsyncSessionLocal() as session:
+        use_case = build_order_use_case(session)
+        rows = parse_import_lines(iter_lines(_read_chunks(path)), fmt)
+        report = await use_case.import_orders(rows, chunk_size=chunk_size)
+    print(json.dumps(report, indent=2))
+    return 1 if report["errors"] else 0
+
+
+async def rebuild_sales() -> int:
+    """
+    Recompute the sales rollup tables from all closed orders.
+    """
+    async with AsyncSessionLocal() as session:
+        use_case = ReportUseCase(
+            AsyncSQLAlchemySalesReportRepository(session),
+            AsyncSQLAlchemyUnitOfWork(session)
+        )
+        rolled_up, skipped = await use_case.rebuild()
+    print(f"{rolled_up} closed order(s) rolled up")
+    if skipped:
+        print(f"{skipped} closed order(s) skipped: no closed_at recorded")
+    return 0
+
+
+async def _run(args: argparse.Namespace) -> int:
+    try:
+        return await args.handler(args)
+    finally:
+        await async_engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli", description="Restaurant system maintenance commands"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    check = commands.add_parser(
+        "check-totals", help="detect orders whose total drifted from their items"
+    )
+    check.add_argument(
+        "--fix", action="store_true", help="rewrite drifted totals from their items"
+    )
+    check.set_defaults(handler=lambda args: check_totals(args.fix))
+
+    importer = commands.add_parser(
+        "import-orders", help="bulk import orders from NDJSON or CSV"
+    )
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    importer.add_argument("--chunk-size", type=int, default=1000)
+    importer.set_defaults(
+        handler=lambda args: import_orders(args.path, args.format, args.chunk_size)
+    )
+
+    rebuild = commands.add_parser(
+        "rebuild-sales", help="recompute the sales rollup tables from history"
+    )
+    rebuild.set_defaults(handler=lambda args: rebuild_sales())
+
+    args = parser.parse_args(argv)
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,6 @@
+from zoneinfo import ZoneInfo
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -5,6 +8,56 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     DATABASE_URL: str = "sqlite:///banco.db"
+    # Async driver URL used by the API. When unset it is derived from DATABASE_URL
+    # (e.g. sqlite:///banco.db -> sqlite+aiosqlite:///banco.db).
+    ASYNC_DATABASE_URL: str | None = None
+    # SQLite PRAGMA profile applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    # Negative values are KiB, so -65536 is a 64 MiB page cache per connection
+    SQLITE_CACHE_SIZE: int = -65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    # In-process cache of authenticated users used by validate_token
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    # Cache of already verified bearer tokens; entries never outlive the token's exp
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    # In-process order event bus feeding the /order/events SSE stream
+    ORDER_EVENT_HISTORY_SIZE: int = 1000
+    ORDER_EVENT_QUEUE_SIZE: int = 100
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    # IANA time zone whose calendar days bucket the sales rollups and set the
+    # default report range; closed_at and the other timestamps stay in UTC
+    BUSINESS_TIMEZONE: str = "UTC"
+    # Per-request SQL profiling: requests slower than this are logged with their SQL
+    SLOW_REQUEST_THRESHOLD_MS: float = 500.0
+    # Statements kept per request for the slow log
+    SLOW_REQUEST_MAX_STATEMENTS: int = 50
+    # Send db/hash/total durations in a Server-Timing response header
+    SERVER_TIMING_ENABLED: bool = False
+    # Transactions failing with SQLITE_BUSY/SQLITE_LOCKED are retried with
+    # jittered exponential backoff until this many seconds have passed
+    DB_BUSY_RETRY_DEADLINE_SECONDS: float = 10.0
+    DB_BUSY_RETRY_BASE_DELAY_MS: float = 10.0
+    DB_BUSY_RETRY_MAX_DELAY_MS: float = 500.0
+    # Times an order mutation is run again from a fresh load when another
+    # writer changed the order between its read and its conditional UPDATE
+    ORDER_CONFLICT_RETRIES: int = 3
+    # Order mutations are funneled through one in-process writer that commits
+    # the mutations queued while the previous group ran in one transaction.
+    # When disabled every request commits its own transaction.
+    WRITE_GROUP_COMMIT_ENABLED: bool = True
+    # Extra time the writer waits for more mutations before starting a group
+    WRITE_GROUP_COMMIT_WINDOW_MS: float = 0.0
+    WRITE_GROUP_COMMIT_MAX_BATCH: int = 64
+    # Password hashing runs on a dedicated thread pool off the event loop
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_POOL_SIZE: int = 4
+    # Maximum hashing jobs running or waiting before requests are rejected with 503
+    BCRYPT_MAX_PENDING: int = 64
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -12,4 +65,18 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+    @field_validator("BUSINESS_TIMEZONE")
+    @classmethod
+    def check_timezone(cls, value: str) -> str:
+        ZoneInfo(value)
+        return value
+
+    @property
+    def async_database_url(self) -> str:
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        if self.DATABASE_URL.startswith("sqlite:"):
+            return self.DATABASE_URL.replace("sqlite:", "sqlite+aiosqlite:", 1)
+        return self.DATABASE_URL
+
 settings = Settings()
@@ -1,44 +1,153 @@
-from fastapi import Depends, HTTPException, status
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from src.infrastructure.db.database import SessionLocal
-from src.infrastructure.db.repositories import SQLAlchemyUserRepository, SQLAlchemyOrderRepository
-from src.domain.use_cases import AuthUseCase, OrderUseCase
-from src.infrastructure.security import decode_access_token
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.domain.interfaces import OrderEventPublisherInterface, UnitOfWorkInterface
+from src.domain.use_cases import AsyncAuthUseCase, AsyncOrderUseCase, ReportUseCase
+from src.infrastructure.cache import snapshot_user, user_cache
+from src.infrastructure.db.database import AsyncSessionLocal
 from src.infrastructure.db.models import User
+from src.infrastructure.db.repositories import (
+    AsyncSQLAlchemyOrderReadRepository,
+    AsyncSQLAlchemyOrderRepository,
+    AsyncSQLAlchemySalesReportRepository,
+    AsyncSQLAlchemyUserRepository,
+)
+from src.infrastructure.db.unit_of_work import AsyncSQLAlchemyUnitOfWork
+from src.infrastructure.db.write_queue import (
+    DirectWriter,
+    GroupCommitWriter,
+    OrderWriter,
+)
+from src.infrastructure.events import OrderEventBus, order_events
+from src.infrastructure.security import decode_access_token
 
 # Define the OAuth2 security scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login-form")
+# Same scheme without the automatic 401, for routes with a token fallback
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl="auth/login-form", auto_error=False
+)
+
+def get_session_factory() -> async_sessionmaker:
+    """
+    Dependency returning the async session factory.
+    Streaming endpoints use it to open sessions that outlive the dependency scope.
+    """
+    return AsyncSessionLocal
 
-def get_session():
+async def get_session(
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
     """
-    Dependency to obtain database session.
-    Kept for backward compatibility with legacy router injections.
+    Dependency to obtain an async database session.
+    The driver is selected through Settings.ASYNC_DATABASE_URL.
     """
-    session = SessionLocal()
-    try:
+    async with session_factory() as session:
         yield session
-    finally:
-        session.close()
 
-def get_user_repository(session: Session = Depends(get_session)) -> SQLAlchemyUserRepository:
-    return SQLAlchemyUserRepository(session)
+def get_order_events() -> OrderEventBus:
+    return order_events
+
+def build_order_use_case(
+    session: AsyncSession,
+    uow: Optional[UnitOfWorkInterface] = None,
+    events: OrderEventPublisherInterface = order_events
+) -> AsyncOrderUseCase:
+    return AsyncOrderUseCase(
+        AsyncSQLAlchemyOrderRepository(session),
+        AsyncSQLAlchemyOrderReadRepository(session),
+        AsyncSQLAlchemySalesReportRepository(session),
+        events,
+        uow or AsyncSQLAlchemyUnitOfWork(session)
+    )
+
+@lru_cache
+def _order_writer(session_factory: async_sessionmaker) -> OrderWriter:
+    if not settings.WRITE_GROUP_COMMIT_ENABLED:
+        return DirectWriter(session_factory, build_order_use_case, order_events)
+    return GroupCommitWriter(
+        session_factory,
+        build_order_use_case,
+        order_events,
+        window=settings.WRITE_GROUP_COMMIT_WINDOW_MS / 1000,
+        max_batch=settings.WRITE_GROUP_COMMIT_MAX_BATCH
+    )
+
+def get_order_writer(
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+) -> OrderWriter:
+    """
+    Writer that order mutations are submitted to, one per session factory.
+    """
+    return _order_writer(session_factory)
+
+def get_unit_of_work(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncSQLAlchemyUnitOfWork:
+    """
+    Transaction boundary of the request; shares the session with its repositories.
+    """
+    return AsyncSQLAlchemyUnitOfWork(session)
+
+def get_user_repository(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncSQLAlchemyUserRepository:
+    return AsyncSQLAlchemyUserRepository(session)
+
+def get_order_repository(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncSQLAlchemyOrderRepository:
+    return AsyncSQLAlchemyOrderRepository(session)
+
+def get_order_read_repository(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncSQLAlchemyOrderReadRepository:
+    return AsyncSQLAlchemyOrderReadRepository(session)
 
-def get_order_repository(session: Session = Depends(get_session)) -> SQLAlchemyOrderRepository:
-    return SQLAlchemyOrderRepository(session)
+def get_sales_report_repository(
+    session: AsyncSession = Depends(get_session)
+) -> AsyncSQLAlchemySalesReportRepository:
+    return AsyncSQLAlchemySalesReportRepository(session)
 
-def get_auth_use_case(user_repo: SQLAlchemyUserRepository = Depends(get_user_repository)) -> AuthUseCase:
-    return AuthUseCase(user_repo)
+def get_auth_use_case(
+    user_repo: AsyncSQLAlchemyUserRepository = Depends(get_user_repository),
+    uow: AsyncSQLAlchemyUnitOfWork = Depends(get_unit_of_work)
+) -> AsyncAuthUseCase:
+    return AsyncAuthUseCase(user_repo, uow)
 
-def get_order_use_case(order_repo: SQLAlchemyOrderRepository = Depends(get_order_repository)) -> OrderUseCase:
-    return OrderUseCase(order_repo)
+def get_order_use_case(
+    order_repo: AsyncSQLAlchemyOrderRepository = Depends(get_order_repository),
+    read_repo: AsyncSQLAlchemyOrderReadRepository = Depends(
+        get_order_read_repository
+    ),
+    sales_repo: AsyncSQLAlchemySalesReportRepository = Depends(
+        get_sales_report_repository
+    ),
+    events: OrderEventBus = Depends(get_order_events),
+    uow: AsyncSQLAlchemyUnitOfWork = Depends(get_unit_of_work)
+) -> AsyncOrderUseCase:
+    return AsyncOrderUseCase(order_repo, read_repo, sales_repo, events, uow)
 
-def validate_token(
+def get_report_use_case(
+    sales_repo: AsyncSQLAlchemySalesReportRepository = Depends(
+        get_sales_report_repository
+    ),
+    uow: AsyncSQLAlchemyUnitOfWork = Depends(get_unit_of_work)
+) -> ReportUseCase:
+    return ReportUseCase(sales_repo, uow)
+
+async def validate_token(
     token: str = Depends(oauth2_scheme),
-    user_repo: SQLAlchemyUserRepository = Depends(get_user_repository)
+    user_repo: AsyncSQLAlchemyUserRepository = Depends(get_user_repository)
 ) -> User:
     """
     Validate the authorization token and return the current user.
+    Users are served from the in-process user cache when possible.
     """
     user_id = decode_access_token(token)
     if user_id is None:
@@ -47,10 +156,38 @@ def validate_token(
             detail="Access denied, check token validity"
         )
     
-    user = user_repo.get_by_id(user_id)
-    if not user:
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await user_repo.get_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Aceess declined!!"
+            )
+        user = snapshot_user(user)
+        user_cache.set(user_id, user)
+    return user
+
+async def validate_stream_token(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(
+        None, description="Bearer token, for clients that cannot set headers"
+    ),
+    user_repo: AsyncSQLAlchemyUserRepository = Depends(get_user_repository)
+) -> User:
+    """
+    validate_token for event streams: a browser EventSource cannot send the
+    Authorization header, so the token may come as ?access_token= instead.
+    """
+    return await validate_token(header_token or access_token or "", user_repo)
+
+def require_admin(user: User = Depends(validate_token)) -> User:
+    """
+    Restrict an endpoint to administrators.
+    """
+    if not user.admin:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Aceess declined!!"
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Forbidden: You do not have access to this resource."
         )
     return user
@@ -0,0 +1,21 @@
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+from src.config import settings
+
+
+def utcnow() -> datetime:
+    """
+    Current UTC time as a naive datetime, the form stored in SQLite DateTime columns.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def business_day(moment: datetime) -> date:
+    """
+    Calendar day of a naive UTC datetime in settings.BUSINESS_TIMEZONE.
+    """
+    zone = ZoneInfo(settings.BUSINESS_TIMEZONE)
+    return moment.replace(tzinfo=timezone.utc).astimezone(zone).date()
+
+def business_today() -> date:
+    return business_day(utcnow())
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class OrderItemEntity:
+    """
+    Read-only snapshot of an order item, detached from any session.
+    """
+    id: int
+    amount: int
+    flavor: str
+    size: str
+    unit_price_cents: int
+    order_id: int
+
+    @property
+    def total_cents(self) -> int:
+        return self.amount * self.unit_price_cents
+
+
+@dataclass(frozen=True, slots=True)
+class OrderEntity:
+    """
+    Read-only snapshot of an order and its items, used by the list and detail
+    endpoints. Built from plain rows, so it carries no ORM tracking state.
+    """
+    id: int
+    user_id: int
+    status: str
+    price_cents: int
+    created_at: datetime
+    updated_at: datetime
+    change_seq: int
+    closed_at: Optional[datetime]
+    version: int
+    items: Tuple[OrderItemEntity, ...] = ()
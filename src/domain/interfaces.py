@@ -1,46 +1,178 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from src.infrastructure.db.models import User, Order, OrderItem
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+
+from src.domain.entities import OrderEntity
+from src.infrastructure.db.models import Order, OrderItem, OrderItemTombstone, User
+
+
+class UnitOfWorkInterface(ABC):
+    """
+    Transaction boundary shared by the repositories of one request or job.
+    Repositories only stage changes; the use case commits once. Leaving an
+    `async with` block through an exception rolls the staged changes back.
+    """
+    @abstractmethod
+    async def commit(self) -> None:
+        pass
+
+    @abstractmethod
+    async def rollback(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "UnitOfWorkInterface":
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            await self.rollback()
+
+class AsyncUserRepositoryInterface(ABC):
+    @abstractmethod
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def create(self, user: User) -> User:
+        pass
+
+
+class ConcurrentUpdateError(Exception):
+    """
+    The order was changed by another writer after it was loaded, so a
+    conditional write matched no row. Retrying with fresh state resolves it.
+    """
+
+class OrderVersionMismatchError(Exception):
+    """
+    The order's version is not the one the client expected (If-Match).
+    """
+
+class AsyncOrderRepositoryInterface(ABC):
+    """
+    Writes to an order are conditional on the version it was loaded with and
+    raise ConcurrentUpdateError when it changed in the meantime.
+    """
+    @abstractmethod
+    async def get_by_id(self, order_id: int) -> Optional[Order]:
+        pass
+
+    @abstractmethod
+    async def create(self, order: Order) -> Order:
+        pass
+
+    @abstractmethod
+    async def save(self, order: Order) -> Order:
+        pass
+
+    @abstractmethod
+    async def get_item_by_id(self, item_id: int) -> Optional[OrderItem]:
+        pass
 
-class UserRepositoryInterface(ABC):
     @abstractmethod
-    def get_by_id(self, user_id: int) -> Optional[User]:
+    async def add_item(self, order: Order, item: OrderItem) -> Order:
         pass
 
     @abstractmethod
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def add_items(self, order: Order, items: List[dict]) -> Order:
         pass
 
     @abstractmethod
-    def create(self, user: User) -> User:
+    async def delete_item(self, order: Order, item: OrderItem) -> Order:
         pass
 
+    @abstractmethod
+    def iter_export(
+        self,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        pass
 
-class OrderRepositoryInterface(ABC):
     @abstractmethod
-    def get_by_id(self, order_id: int) -> Optional[Order]:
+    async def get_changes(
+        self,
+        since: int,
+        limit: int,
+        user_id: Optional[int] = None
+    ) -> Tuple[List[Order], List[OrderItemTombstone]]:
         pass
 
     @abstractmethod
-    def get_all(self) -> List[Order]:
+    async def existing_user_ids(self, user_ids: Iterable[int]) -> Set[int]:
         pass
 
     @abstractmethod
-    def get_by_user_id(self, user_id: int) -> List[Order]:
+    async def bulk_insert_orders(self, orders: List[dict]) -> List[int]:
         pass
 
     @abstractmethod
-    def create(self, order: Order) -> Order:
+    async def find_price_drift(self) -> List[Tuple[int, int, int]]:
+        pass
+
+    @abstractmethod
+    async def fix_price_drift(self) -> int:
+        pass
+
+
+
+class AsyncOrderReadRepositoryInterface(ABC):
+    """
+    Read side of the orders: returns detached OrderEntity snapshots.
+    """
+    @abstractmethod
+    async def get_by_id(self, order_id: int) -> Optional[OrderEntity]:
         pass
 
     @abstractmethod
-    def save(self, order: Order) -> Order:
+    async def get_page(
+        self,
+        limit: int,
+        cursor: Optional[int] = None,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> List[OrderEntity]:
         pass
 
+class SalesReportRepositoryInterface(ABC):
     @abstractmethod
-    def get_item_by_id(self, item_id: int) -> Optional[OrderItem]:
+    async def record_order(
+        self, order: Order, status: str, day: date, sign: int = 1
+    ) -> None:
         pass
 
     @abstractmethod
-    def delete_item(self, item: OrderItem) -> None:
+    async def rebuild(self) -> Tuple[int, int]:
+        pass
+
+    @abstractmethod
+    async def daily_revenue(self, start: date, end: date, status: str) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def item_breakdown(
+        self,
+        start: date,
+        end: date,
+        status: str,
+        group_by: str,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        pass
+
+    @abstractmethod
+    async def status_breakdown(self, start: date, end: date) -> List[dict]:
+        pass
+
+
+
+class OrderEventPublisherInterface(ABC):
+    @abstractmethod
+    def publish(self, event_type: str, order: Order, **data) -> object:
         pass
@@ -0,0 +1,40 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+CENTS_PER_UNIT = 100
+# Largest amount a 64-bit INTEGER column can hold
+MAX_CENTS = 2**63 - 1
+
+def to_cents(value: float | int | str | Decimal) -> int:
+    """
+    Convert a decimal amount (e.g. 29.90) to integer cents, rounding half up.
+    Goes through str() so binary float noise like 29.899999 does not leak in.
+    Raises ValueError for values that are not a finite amount in range.
+    """
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Not a decimal amount: {value!r}") from None
+    if not amount.is_finite():
+        raise ValueError(f"Not a finite amount: {value!r}")
+    # Checked before quantize, which fails past the context's 28 digits
+    if abs(amount) * CENTS_PER_UNIT > MAX_CENTS:
+        raise ValueError(f"Amount out of range: {value!r}")
+    return int((amount * CENTS_PER_UNIT).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+def line_total_cents(amount: int, unit_price_cents: int) -> int:
+    """
+    Total of one order line in cents.
+    Raises ValueError when it does not fit a 64-bit INTEGER column.
+    """
+    total = amount * unit_price_cents
+    if abs(total) > MAX_CENTS:
+        raise ValueError(
+            f"Line total out of range: {amount} x {unit_price_cents} cents"
+        )
+    return total
+
+def from_cents(cents: int) -> float:
+    """
+    Convert integer cents back to a decimal amount for display.
+    """
+    return cents / CENTS_PER_UNIT
@@ -1,34 +1,84 @@
-from datetime import timedelta
-from typing import List, Optional, Union
-from src.domain.interfaces import UserRepositoryInterface, OrderRepositoryInterface
-from src.infrastructure.db.models import User, Order, OrderItem
-from src.infrastructure.security import hash_password, verify_password, create_access_token
+from datetime import date, datetime, time, timedelta
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
 from src.config import settings
+from src.domain.clock import business_day, utcnow
+from src.domain.entities import OrderEntity
+from src.domain.interfaces import (
+    AsyncOrderReadRepositoryInterface,
+    AsyncOrderRepositoryInterface,
+    AsyncUserRepositoryInterface,
+    ConcurrentUpdateError,
+    OrderEventPublisherInterface,
+    OrderVersionMismatchError,
+    SalesReportRepositoryInterface,
+    UnitOfWorkInterface,
+)
+from src.infrastructure.db.models import Order, OrderItem, User
+from src.infrastructure.db.retry import busy_retry
+from src.infrastructure.security import (
+    create_access_token,
+    hash_password_async,
+    verify_password_async,
+)
+
+T = TypeVar("T")
 
-class AuthUseCase:
-    def __init__(self, user_repo: UserRepositoryInterface):
+class AsyncAuthUseCase:
+    """
+    Registration, login and tokens, used by the API routes.
+    """
+    def __init__(
+        self, user_repo: AsyncUserRepositoryInterface, uow: UnitOfWorkInterface
+    ):
         self.user_repo = user_repo
+        self.uow = uow
 
-    def register_user(self, name: str, email: str, password: str, active: bool = True, admin: bool = False) -> User:
+    async def register_user(
+        self,
+        name: str,
+        email: str,
+        password: str,
+        active: bool = True,
+        admin: bool = False
+    ) -> User:
         """
         Registers a new user after checking if the email already exists.
         """
-        existing_user = self.user_repo.get_by_email(email)
+        existing_user = await self.user_repo.get_by_email(email)
         if existing_user:
             raise ValueError("A user with this email already exists")
-        
-        hashed = hash_password(password)
-        new_user = User(name=name, email=email, password=hashed, active=active, admin=admin)
-        return self.user_repo.create(new_user)
 
-    def authenticate(self, email: str, password: str) -> Union[User, bool]:
+        hashed = await hash_password_async(password)
+
+        async def attempt() -> User:
+            async with self.uow:
+                new_user = await self.user_repo.create(User(
+                    name=name, email=email, password=hashed, active=active, admin=admin
+                ))
+                await self.uow.commit()
+            return new_user
+
+        return await busy_retry.run("register_user", attempt)
+
+    async def authenticate(self, email: str, password: str) -> Union[User, bool]:
         """
         Verifies credentials against hashed password.
         """
-        user = self.user_repo.get_by_email(email)
+        user = await self.user_repo.get_by_email(email)
         if not user:
             return False
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             return False
         return user
 
@@ -55,84 +105,406 @@ class AuthUseCase:
         }
 
 
-class OrderUseCase:
-    def __init__(self, order_repo: OrderRepositoryInterface):
+class AsyncOrderUseCase:
+    """
+    Order operations used by the API routes.
+    Each mutation stages its writes through the repositories and commits once
+    through the unit of work; closing an order (finish/cancel) updates the sales
+    rollups in that same transaction. Every committed change is published to
+    the order event bus.
+    Reads go through `read_repo` and return detached OrderEntity snapshots;
+    mutations load tracked ORM orders from `order_repo`.
+    """
+    def __init__(
+        self,
+        order_repo: AsyncOrderRepositoryInterface,
+        read_repo: AsyncOrderReadRepositoryInterface,
+        sales_repo: SalesReportRepositoryInterface,
+        events: OrderEventPublisherInterface,
+        uow: UnitOfWorkInterface
+    ):
         self.order_repo = order_repo
+        self.read_repo = read_repo
+        self.sales_repo = sales_repo
+        self.events = events
+        self.uow = uow
 
-    def list_orders(self, user: User) -> List[Order]:
+    async def list_orders(
+        self,
+        user: User,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        status: Optional[str] = None,
+        user_id: Optional[int] = None
+    ) -> Tuple[List[OrderEntity], Optional[int]]:
         """
-        List orders depending on user privileges.
+        List a page of orders depending on user privileges.
+        Returns the orders and the cursor of the next page (None on the last page).
         """
-        if user.admin:
-            return self.order_repo.get_all()
-        return self.order_repo.get_by_user_id(user.id)
+        if not user.admin:
+            if user_id is not None and user_id != user.id:
+                raise PermissionError(
+                    "Forbidden: You do not have access to this resource."
+                )
+            user_id = user.id
 
-    def create_order(self, user_id: int) -> Order:
+        # Fetch one extra row to know whether another page exists
+        orders = await self.read_repo.get_page(
+            limit + 1, cursor=cursor, user_id=user_id, status=status
+        )
+        if len(orders) > limit:
+            orders = orders[:limit]
+            return orders, orders[-1].id
+        return orders, None
+
+    async def create_order(self, user_id: int) -> Order:
         """
         Creates a new, empty order.
         """
-        new_order = Order(user_id=user_id)
-        return self.order_repo.create(new_order)
+        async with self.uow:
+            new_order = await self.order_repo.create(Order(user_id=user_id))
+            await self.uow.commit()
+        self.events.publish("created", new_order)
+        return new_order
 
-    def get_order(self, order_id: int, user: User) -> Order:
+    def export_orders(
+        self,
+        user: User,
+        status: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Streams every order with its items, optionally only those created between
+        the `start` and `end` days (inclusive). Admin only; the check runs before
+        the first row is read so callers can still answer 403.
+        """
+        if not user.admin:
+            raise PermissionError("Forbidden: You do not have access to this resource.")
+        if start is not None and end is not None and start > end:
+            raise ValueError("start must not be after end")
+        return self.order_repo.iter_export(
+            status=status,
+            created_from=datetime.combine(start, time.min) if start else None,
+            created_to=(
+                datetime.combine(end + timedelta(days=1), time.min) if end else None
+            )
+        )
+
+    async def list_changes(self, user: User, since: int = 0, limit: int = 100) -> dict:
+        """
+        Orders changed after change sequence number `since` and the items deleted
+        since then, for delta sync. Admins see every order, other users their own.
+        Poll again with `next_since`; `has_more` means the page was full.
+        """
+        orders, tombstones = await self.order_repo.get_changes(
+            since, limit, user_id=None if user.admin else user.id
+        )
+        seqs = [order.change_seq for order in orders]
+        seqs += [tombstone.change_seq for tombstone in tombstones]
+        return {
+            "orders": orders,
+            "deleted_items": tombstones,
+            "next_since": max(seqs, default=since),
+            "has_more": len(orders) == limit,
+        }
+
+    async def get_order(self, order_id: int, user: User) -> OrderEntity:
         """
         Gets an order by ID and verifies permissions.
         """
-        order = self.order_repo.get_by_id(order_id)
+        return self._check_access(await self.read_repo.get_by_id(order_id), user)
+
+    async def _get_order_for_update(
+        self, order_id: int, user: User, expected_version: Optional[int] = None
+    ) -> Order:
+        """
+        Loads the tracked ORM order that a mutation will change. With
+        `expected_version` the order must still be at that version.
+        """
+        order = self._check_access(await self.order_repo.get_by_id(order_id), user)
+        if expected_version is not None and order.version != expected_version:
+            raise OrderVersionMismatchError(
+                f"Order {order_id} is at version {order.version}, "
+                f"not {expected_version}"
+            )
+        return order
+
+    @staticmethod
+    def _check_access(order, user: User):
         if not order:
             raise LookupError("Order not found")
-        
+
         if not user.admin and user.id != order.user_id:
             raise PermissionError("Forbidden: You do not have access to this resource.")
-        
+
         return order
 
-    def cancel_order(self, order_id: int, user: User) -> Order:
+    @staticmethod
+    def _check_open(order: Order) -> None:
+        """
+        Items of closed orders are frozen: the sales rollups counted them
+        when the order was closed.
+        """
+        if order.status == "CANCELED":
+            raise ValueError("Cannot change the items of a canceled order.")
+        if order.status == "FINISHED":
+            raise ValueError("Cannot change the items of a finished order.")
+
+    @staticmethod
+    async def _retry_on_conflict(mutation: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `mutation` again when its conditional write lost to a concurrent
+        writer. The unit of work rolled back and expired the order, so the
+        next attempt decides on fresh state.
+        """
+        for _ in range(settings.ORDER_CONFLICT_RETRIES):
+            try:
+                return await mutation()
+            except ConcurrentUpdateError:
+                continue
+        return await mutation()
+
+    async def cancel_order(
+        self, order_id: int, user: User, expected_version: Optional[int] = None
+    ) -> Order:
+        """
+        Cancels an order, moving it out of the FINISHED rollups if it was finished.
+        """
+        async def attempt() -> Order:
+            async with self.uow:
+                order = await self._get_order_for_update(
+                    order_id, user, expected_version
+                )
+                if order.status == "CANCELED":
+                    return order
+
+                now = utcnow()
+                if order.status == "FINISHED" and order.closed_at is not None:
+                    await self.sales_repo.record_order(
+                        order, "FINISHED", business_day(order.closed_at), sign=-1
+                    )
+                await self.sales_repo.record_order(order, "CANCELED", business_day(now))
+                order.status = "CANCELED"
+                order.closed_at = now
+                order = await self.order_repo.save(order)
+                await self.uow.commit()
+            self.events.publish("canceled", order)
+            return order
+
+        return await self._retry_on_conflict(attempt)
+
+    async def add_item(
+        self,
+        order_id: int,
+        amount: int,
+        flavor: str,
+        size: str,
+        unit_price_cents: int,
+        user: User,
+        expected_version: Optional[int] = None
+    ) -> Order:
         """
-        Cancels an order.
+        Appends an item to the order; the repository applies the price delta.
         """
-        order = self.get_order(order_id, user)
-        order.status = "CANCELED"
-        return self.order_repo.save(order)
+        async def attempt() -> Order:
+            async with self.uow:
+                order = await self._get_order_for_update(
+                    order_id, user, expected_version
+                )
+                self._check_open(order)
+                new_item = OrderItem(
+                    amount=amount,
+                    flavor=flavor,
+                    size=size,
+                    unit_price_cents=unit_price_cents,
+                    order=order_id
+                )
+                order = await self.order_repo.add_item(order, new_item)
+                await self.uow.commit()
+            self.events.publish("item_added", order, item_ids=[new_item.id])
+            return order
+
+        return await self._retry_on_conflict(attempt)
 
-    def add_item(self, order_id: int, amount: int, flavor: str, size: str, unit_price: float, user: User) -> Order:
+    async def add_items(
+        self,
+        order_id: int,
+        items: List[dict],
+        user: User,
+        expected_version: Optional[int] = None
+    ) -> Order:
         """
-        Appends an item to the order and updates its total price.
+        Appends many items at once: one permission check, one bulk insert, one commit.
+        Each item is a mapping with amount, flavor, size and unit_price_cents.
         """
-        order = self.get_order(order_id, user)
-        
-        new_item = OrderItem(amount=amount, flavor=flavor, size=size, init_price=unit_price, order=order_id)
-        order.items.append(new_item)
-        order.sum_price()
-        
-        return self.order_repo.save(order)
+        if not items:
+            raise ValueError("At least one item is required.")
+
+        async def attempt() -> Order:
+            async with self.uow:
+                order = await self._get_order_for_update(
+                    order_id, user, expected_version
+                )
+                self._check_open(order)
+                known_ids = {item.id for item in order.items}
+                order = await self.order_repo.add_items(order, items)
+                await self.uow.commit()
+            new_ids = [item.id for item in order.items if item.id not in known_ids]
+            self.events.publish("item_added", order, item_ids=new_ids)
+            return order
+
+        return await self._retry_on_conflict(attempt)
 
-    def delete_item(self, item_id: int, user: User) -> Order:
+    async def delete_item(
+        self, item_id: int, user: User, expected_version: Optional[int] = None
+    ) -> Order:
         """
-        Removes an item from an order and updates the total price.
+        Removes an item from an order; the repository applies the price delta.
         """
-        item = self.order_repo.get_item_by_id(item_id)
-        if not item:
-            raise LookupError("Item not found")
-        
-        order = self.get_order(item.order_id, user)
-        self.order_repo.delete_item(item)
-        order.sum_price()
-        
-        return self.order_repo.save(order)
+        async def attempt() -> Order:
+            async with self.uow:
+                item = await self.order_repo.get_item_by_id(item_id)
+                if not item:
+                    raise LookupError("Item not found")
 
-    def finalize_order(self, order_id: int, user: User) -> List[OrderItem]:
+                order = await self._get_order_for_update(
+                    item.order_id, user, expected_version
+                )
+                self._check_open(order)
+                order = await self.order_repo.delete_item(order, item)
+                await self.uow.commit()
+            self.events.publish("item_deleted", order, item_ids=[item_id])
+            return order
+
+        return await self._retry_on_conflict(attempt)
+
+    async def finalize_order(
+        self, order_id: int, user: User, expected_version: Optional[int] = None
+    ) -> Order:
         """
         Finalizes an order.
         """
-        order = self.get_order(order_id, user)
-        
-        if order.status == "CANCELED":
-            raise ValueError("Cannot finish a canceled order.")
-        
-        if order.status == "FINISHED":
-            raise ValueError("The order was already finalized.")
-        
-        order.status = "FINISHED"
-        self.order_repo.save(order)
-        return order.items
+        async def attempt() -> Order:
+            async with self.uow:
+                order = await self._get_order_for_update(
+                    order_id, user, expected_version
+                )
+
+                if order.status == "CANCELED":
+                    raise ValueError("Cannot finish a canceled order.")
+
+                if order.status == "FINISHED":
+                    raise ValueError("The order was already finalized.")
+
+                now = utcnow()
+                await self.sales_repo.record_order(order, "FINISHED", business_day(now))
+                order.status = "FINISHED"
+                order.closed_at = now
+                await self.order_repo.save(order)
+                await self.uow.commit()
+            self.events.publish("finished", order)
+            return order
+
+        return await self._retry_on_conflict(attempt)
+
+    async def import_orders(
+        self,
+        rows: AsyncIterable[Tuple[int, Union[dict, str]]],
+        chunk_size: int = 1000
+    ) -> dict:
+        """
+        Bulk-imports orders from (line number, order dict or error message) pairs.
+        Valid orders are written in chunks of `chunk_size`, each chunk in one
+        transaction; invalid rows are reported without aborting the import.
+        """
+        report = {"imported": 0, "errors": []}
+        chunk: List[Tuple[int, dict]] = []
+
+        async def attempt() -> Tuple[List[int], List[dict]]:
+            async with self.uow:
+                known_users = await self.order_repo.existing_user_ids(
+                    row["user_id"] for _, row in chunk
+                )
+                valid, errors = [], []
+                for line, row in chunk:
+                    if row["user_id"] in known_users:
+                        valid.append(row)
+                    else:
+                        error = f"Unknown user_id {row['user_id']}"
+                        errors.append({"line": line, "error": error})
+                imported = await self.order_repo.bulk_insert_orders(valid)
+                await self.uow.commit()
+            return imported, errors
+
+        async def flush():
+            # The report only changes once the chunk is committed, so a retried
+            # chunk is neither counted nor reported twice
+            imported, errors = await busy_retry.run("import_orders", attempt)
+            report["imported"] += len(imported)
+            report["errors"].extend(errors)
+            chunk.clear()
+
+        async for line, row in rows:
+            if isinstance(row, str):
+                report["errors"].append({"line": line, "error": row})
+                continue
+            chunk.append((line, row))
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+        return report
+
+
+class ReportUseCase:
+    """
+    Sales reports answered from the rollup tables, in O(days) rather than O(items).
+    """
+    def __init__(
+        self, sales_repo: SalesReportRepositoryInterface, uow: UnitOfWorkInterface
+    ):
+        self.sales_repo = sales_repo
+        self.uow = uow
+
+    @staticmethod
+    def _check_range(start: date, end: date) -> None:
+        if start > end:
+            raise ValueError("start must not be after end")
+
+    async def revenue(self, start: date, end: date) -> dict:
+        """
+        Revenue of finished orders per day, plus the period totals.
+        """
+        self._check_range(start, end)
+        days = await self.sales_repo.daily_revenue(start, end, "FINISHED")
+        return {
+            "start": start,
+            "end": end,
+            "order_count": sum(day["order_count"] for day in days),
+            "revenue_cents": sum(day["revenue_cents"] for day in days),
+            "days": days,
+        }
+
+    async def top_flavors(self, start: date, end: date, limit: int = 10) -> List[dict]:
+        self._check_range(start, end)
+        return await self.sales_repo.item_breakdown(
+            start, end, "FINISHED", "flavor", limit=limit
+        )
+
+    async def sizes(self, start: date, end: date) -> List[dict]:
+        self._check_range(start, end)
+        return await self.sales_repo.item_breakdown(start, end, "FINISHED", "size")
+
+    async def statuses(self, start: date, end: date) -> List[dict]:
+        self._check_range(start, end)
+        return await self.sales_repo.status_breakdown(start, end)
+
+    async def rebuild(self) -> Tuple[int, int]:
+        """
+        Recomputes the rollups from historical orders.
+        """
+        async with self.uow:
+            result = await self.sales_repo.rebuild()
+            await self.uow.commit()
+        return result
@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.infrastructure.db.models import User
+from src.infrastructure.metrics import registry
+
+_MISSING = object()
+_named_caches: dict[str, "TTLCache"] = {}
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after a TTL.
+    Thread-safe; keeps hit/miss counters for monitoring. Named caches are
+    exported on /metrics.
+    """
+    def __init__(self, max_size: int, ttl_seconds: float, name: Optional[str] = None):
+        if name is not None:
+            _named_caches[name] = self
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(
+        self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Store a value. `ttl_seconds` may shorten (never extend) the default TTL.
+        """
+        ttl = self.ttl_seconds
+        if ttl_seconds is not None:
+            ttl = min(ttl_seconds, ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _cache_samples(attribute: str):
+    def collect():
+        for name, cache in _named_caches.items():
+            yield (name,), getattr(cache, attribute)
+    return collect
+
+def _cache_hit_ratio():
+    for name, cache in _named_caches.items():
+        lookups = cache.hits + cache.misses
+        yield (name,), cache.hits / lookups if lookups else 0.0
+
+def _cache_entries():
+    for name, cache in _named_caches.items():
+        yield (name,), len(cache)
+
+registry.callback(
+    "cache_hits_total", "Cache lookups that found a live entry",
+    _cache_samples("hits"), ("cache",), "counter"
+)
+registry.callback(
+    "cache_misses_total", "Cache lookups that found nothing or an expired entry",
+    _cache_samples("misses"), ("cache",), "counter"
+)
+registry.callback(
+    "cache_hit_ratio", "Hits over lookups since the cache was last cleared",
+    _cache_hit_ratio, ("cache",)
+)
+registry.callback("cache_entries", "Entries currently held", _cache_entries, ("cache",))
+
+user_cache = TTLCache(
+    settings.USER_CACHE_MAX_SIZE, settings.USER_CACHE_TTL_SECONDS, name="user"
+)
+
+def snapshot_user(user: User) -> User:
+    """
+    Copy a user into a transient instance that is safe to share across sessions.
+    """
+    return User(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        password=user.password,
+        active=user.active,
+        admin=user.admin
+    )
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+
+# Users written by a session are evicted once its transaction commits, not
+# at flush time: a lookup between flush and commit would re-cache the old row,
+# and a rolled-back change must not evict anything
+_FLUSHED_USER_IDS = "flushed_user_ids"
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_users(session: Session, flush_context) -> None:
+    user_ids = {
+        obj.id for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        session.info.setdefault(_FLUSHED_USER_IDS, set()).update(user_ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_FLUSHED_USER_IDS, ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_users(session: Session, previous_transaction) -> None:
+    # Only the outermost transaction; a rolled back savepoint keeps the rest
+    if previous_transaction.parent is None:
+        session.info.pop(_FLUSHED_USER_IDS, None)
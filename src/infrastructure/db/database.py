@@ -1,18 +1,140 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
 from src.config import settings
+from src.domain.clock import business_day
+from src.infrastructure.metrics import db_pool_checkout_wait_seconds, registry
+from src.infrastructure.profiling import instrument_engine
+
+# uvicorn configures this logger, so database messages show up next to its own
+logger = logging.getLogger("uvicorn.error")
+
+SQLITE_PRAGMAS = (
+    "journal_mode", "synchronous", "cache_size",
+    "mmap_size", "busy_timeout", "temp_store"
+)
+
+def _sqlite_pragma_statements() -> list[str]:
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+    ]
+
+def read_sqlite_pragmas(dbapi_connection) -> dict:
+    """
+    Read back the effective PRAGMA values of a raw DBAPI connection.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        values = {}
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+            values[pragma] = cursor.fetchone()[0]
+        return values
+    finally:
+        cursor.close()
+
+def _sqlite_business_day(value: str | None) -> str | None:
+    """
+    SQL business_day(): the business day of a stored UTC DateTime, as a DATE.
+    """
+    if value is None:
+        return None
+    return business_day(datetime.fromisoformat(value)).isoformat()
 
-# Engine initialization
-# Check if using sqlite to pass check_same_thread exception
-connect_args = {"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
+def configure_sqlite_engine(engine: Engine) -> None:
+    """
+    Apply the Settings PRAGMA profile to each new connection of a SQLite engine,
+    register the business_day() SQL function, and log the effective PRAGMA
+    values once, on the engine's first connection.
+    Pass `async_engine.sync_engine` for async engines.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    logged = False
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=connect_args
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        nonlocal logged
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in _sqlite_pragma_statements():
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+        dbapi_connection.create_function("business_day", 1, _sqlite_business_day)
+        if not logged:
+            logged = True
+            pragmas = read_sqlite_pragmas(dbapi_connection)
+            logger.info(
+                "SQLite pragmas for %s: %s",
+                engine.url.render_as_string(hide_password=True),
+                ", ".join(f"{name}={value}" for name, value in pragmas.items())
+            )
+
+    event.listen(engine, "connect", apply_pragmas)
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout takes, including waiting
+    for a connection to be returned and opening a new one.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start)
+
+def _async_pool_class(url: str):
+    """
+    Instrument the dialect's default pool when it is a queue pool; in-memory
+    SQLite keeps its single shared connection.
+    """
+    parsed = make_url(url)
+    default = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(default, AsyncAdaptedQueuePool):
+        return InstrumentedAsyncQueuePool
+    return default
+
+# Async engine used by the API so queries do not block the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    poolclass=_async_pool_class(settings.async_database_url)
 )
+configure_sqlite_engine(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
 
-# Session factory configuration
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _pool_connections():
+    pool = async_engine.pool
+    if isinstance(pool, QueuePool):
+        yield ("size",), pool.size()
+        yield ("checked_out",), pool.checkedout()
+        yield ("checked_in",), pool.checkedin()
+        # QueuePool counts overflow from -pool_size until the pool is full
+        yield ("overflow",), max(pool.overflow(), 0)
+
+registry.callback(
+    "db_pool_connections",
+    "Connections of the API's async engine pool by state",
+    _pool_connections,
+    ("state",)
+)
+
+# Async sessions cannot lazy load, so loaded state is kept valid after commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
 
 # Modern SQLAlchemy 2.0 Declarative Base
 class Base(DeclarativeBase):
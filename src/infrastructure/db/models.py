@@ -1,7 +1,24 @@
-from sqlalchemy import String, Integer, Float, Boolean, ForeignKey
+from datetime import date, datetime
+from typing import List
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    column,
+    func,
+    select,
+    table,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.domain.clock import utcnow
 from src.infrastructure.db.database import Base
-from typing import List
+
 
 class User(Base):
     __tablename__ = "users"
@@ -23,25 +40,63 @@ class User(Base):
         self.active = active
         self.admin = admin
 
+# Next change sequence number: one more than the highest handed out so far.
+# Orders carry the number of their last write and tombstones reuse the number
+# of the order write that created them, and SQLite runs one writer at a time,
+# so evaluating this inside each write gives every write its own number. The
+# alias keeps the subquery from correlating with the orders row being written.
+_latest_orders = table("orders", column("change_seq")).alias("latest_orders")
+NEXT_CHANGE_SEQ = select(
+    func.coalesce(func.max(_latest_orders.c.change_seq), 0) + 1
+).scalar_subquery()
+
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Serves per-user listings filtered by status and paged by id
+        Index("ix_orders_user_id_status_id", "user_id", "status", "id"),
+        # Serve /order/changes for admins and for a single user
+        Index("ix_orders_change_seq", "change_seq"),
+        Index("ix_orders_user_id_change_seq", "user_id", "change_seq"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     status: Mapped[str] = mapped_column(String, default="PENDING")
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    price: Mapped[float] = mapped_column(Float, default=0.0)
+    # Money is stored as integer cents; the repository maintains totals incrementally
+    price_cents: Mapped[int] = mapped_column(Integer, default=0)
+    # Set when the order is finished or canceled; sales rollups bucket by its day
+    closed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow
+    )
+    # Change sequence number of the order's last write, stamped by every INSERT
+    # and UPDATE, so clients can poll for changes after a number
+    change_seq: Mapped[int] = mapped_column(
+        Integer, default=NEXT_CHANGE_SEQ, onupdate=NEXT_CHANGE_SEQ
+    )
+    # Optimistic concurrency: ORM UPDATEs add "AND version = <loaded version>"
+    # and raise StaleDataError when another writer got there first
+    version: Mapped[int] = mapped_column(Integer, default=1)
+
+    __mapper_args__ = {
+        # Fetch change_seq, computed in SQL, with RETURNING on flush so written
+        # orders never have to be reloaded
+        "eager_defaults": True,
+        "version_id_col": version,
+    }
 
     user: Mapped["User"] = relationship(back_populates="orders")
     items: Mapped[List["OrderItem"]] = relationship(back_populates="order", cascade="all, delete-orphan")
 
-    def __init__(self, user_id: int, status: str = "PENDING", price: float = 0.0, **kwargs):
+    def __init__(
+        self, user_id: int, status: str = "PENDING", price_cents: int = 0, **kwargs
+    ):
         super().__init__(**kwargs)
         self.user_id = user_id
         self.status = status
-        self.price = price
-
-    def sum_price(self):
-        self.price = sum(item.unit_price * item.amount for item in self.items)
+        self.price_cents = price_cents
 
 class OrderItem(Base):
     __tablename__ = "order_item"
@@ -50,15 +105,68 @@ class OrderItem(Base):
     amount: Mapped[int] = mapped_column(Integer)
     flavor: Mapped[str] = mapped_column(String)
     size: Mapped[str] = mapped_column(String)
-    unit_price: Mapped[float] = mapped_column(Float)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"))
+    unit_price_cents: Mapped[int] = mapped_column(Integer)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow
+    )
 
     order: Mapped["Order"] = relationship(back_populates="items")
 
-    def __init__(self, amount: int, flavor: str, size: str, init_price: float, order: int, **kwargs):
+    def __init__(
+        self,
+        amount: int,
+        flavor: str,
+        size: str,
+        unit_price_cents: int,
+        order: int,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.amount = amount
         self.flavor = flavor
         self.size = size
-        self.unit_price = init_price
+        self.unit_price_cents = unit_price_cents
         self.order_id = order
+
+    @property
+    def total_cents(self) -> int:
+        return self.amount * self.unit_price_cents
+
+
+class OrderItemTombstone(Base):
+    """
+    Marks a deleted item so delta-sync clients can drop it.
+    """
+    __tablename__ = "order_item_tombstones"
+
+    item_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), index=True)
+    change_seq: Mapped[int] = mapped_column(Integer, index=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow)
+
+
+class DailySales(Base):
+    """
+    Rollup of closed orders per day and final status.
+    """
+    __tablename__ = "sales_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    order_count: Mapped[int] = mapped_column(Integer, default=0)
+    revenue_cents: Mapped[int] = mapped_column(Integer, default=0)
+
+class DailyItemSales(Base):
+    """
+    Rollup of sold items per day, final status, flavor and size.
+    """
+    __tablename__ = "sales_daily_item"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    flavor: Mapped[str] = mapped_column(String, primary_key=True)
+    size: Mapped[str] = mapped_column(String, primary_key=True)
+    quantity: Mapped[int] = mapped_column(Integer, default=0)
+    revenue_cents: Mapped[int] = mapped_column(Integer, default=0)
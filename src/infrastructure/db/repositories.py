@@ -1,52 +1,589 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from src.domain.interfaces import UserRepositoryInterface, OrderRepositoryInterface
-from src.infrastructure.db.models import User, Order, OrderItem
+from collections import defaultdict
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
 
-class SQLAlchemyUserRepository(UserRepositoryInterface):
-    def __init__(self, session: Session):
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
+
+from src.domain.entities import OrderEntity, OrderItemEntity
+from src.domain.interfaces import (
+    AsyncOrderReadRepositoryInterface,
+    AsyncOrderRepositoryInterface,
+    AsyncUserRepositoryInterface,
+    ConcurrentUpdateError,
+    SalesReportRepositoryInterface,
+)
+from src.domain.money import MAX_CENTS
+from src.infrastructure.db.models import (
+    NEXT_CHANGE_SEQ,
+    DailyItemSales,
+    DailySales,
+    Order,
+    OrderItem,
+    OrderItemTombstone,
+    User,
+)
+
+# Orders are always serialized with their items, so load them for the whole
+# result set with one batched "WHERE order_id IN (...)" query instead of one
+# lazy SELECT per order.
+ORDER_ITEMS_LOADER = selectinload(Order.items)
+
+class AsyncSQLAlchemyUserRepository(AsyncUserRepositoryInterface):
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        return self.session.query(User).filter(User.id == user_id).first()
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.session.scalar(select(User).where(User.id == user_id))
 
-    def get_by_email(self, email: str) -> Optional[User]:
-        return self.session.query(User).filter(User.email == email).first()
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.session.scalar(select(User).where(User.email == email))
 
-    def create(self, user: User) -> User:
+    async def create(self, user: User) -> User:
         self.session.add(user)
-        self.session.commit()
-        self.session.refresh(user)
         return user
 
 
-class SQLAlchemyOrderRepository(OrderRepositoryInterface):
-    def __init__(self, session: Session):
+class AsyncSQLAlchemyOrderRepository(AsyncOrderRepositoryInterface):
+    """
+    AsyncSession based order repository.
+    Items are always loaded with ORDER_ITEMS_LOADER because async sessions
+    cannot lazy load. Every write stamps the order with the next change
+    sequence number and updated_at.
+    Writes are only staged; the caller's unit of work commits them.
+    Order writes are single INSERT/UPDATE ... RETURNING statements that bring
+    back the values computed in SQL, so nothing is reloaded after a write.
+    Updates are conditional on the loaded version and raise
+    ConcurrentUpdateError when another writer changed the order first.
+    """
+    def __init__(self, session: AsyncSession):
         self.session = session
 
-    def get_by_id(self, order_id: int) -> Optional[Order]:
-        return self.session.query(Order).filter(Order.id == order_id).first()
+    async def get_by_id(self, order_id: int) -> Optional[Order]:
+        stmt = select(Order).options(ORDER_ITEMS_LOADER).where(Order.id == order_id)
+        return await self.session.scalar(stmt)
+
+    async def create(self, order: Order) -> Order:
+        self.session.add(order)
+        return order
+
+    async def save(self, order: Order) -> Order:
+        # One UPDATE of the changed columns, guarded by the version; the column
+        # defaults stamp change_seq and updated_at and RETURNING brings them back.
+        # Flushed here so a conflict surfaces before the other staged writes.
+        try:
+            await self.session.flush()
+        except StaleDataError as e:
+            raise ConcurrentUpdateError(
+                f"Order {order.id} was changed concurrently"
+            ) from e
+        return order
 
-    def get_all(self) -> List[Order]:
-        return self.session.query(Order).all()
+    async def get_item_by_id(self, item_id: int) -> Optional[OrderItem]:
+        return await self.session.scalar(
+            select(OrderItem).where(OrderItem.id == item_id)
+        )
 
-    def get_by_user_id(self, user_id: int) -> List[Order]:
-        return self.session.query(Order).filter(Order.user_id == user_id).all()
+    async def add_item(self, order: Order, item: OrderItem) -> Order:
+        order.items.append(item)
+        await self._apply_change(order, item.total_cents)
+        return order
 
-    def create(self, order: Order) -> Order:
-        self.session.add(order)
-        self.session.commit()
-        self.session.refresh(order)
+    async def add_items(self, order: Order, items: List[dict]) -> Order:
+        """
+        Insert many items with one multi-row INSERT ... RETURNING, then apply
+        their combined price delta.
+        """
+        rows = [{**item, "order_id": order.id} for item in items]
+        new_items = list(await self.session.scalars(
+            insert(OrderItem).returning(OrderItem), rows
+        ))
+        set_committed_value(order, "items", [*order.items, *new_items])
+        await self._apply_change(order, sum(item.total_cents for item in new_items))
         return order
 
-    def save(self, order: Order) -> Order:
-        self.session.commit()
-        self.session.refresh(order)
+    async def delete_item(self, order: Order, item: OrderItem) -> Order:
+        order.items.remove(item)
+        await self.session.delete(item)
+        change_seq = await self._apply_change(order, -item.total_cents)
+        self.session.add(OrderItemTombstone(
+            item_id=item.id, order_id=order.id, change_seq=change_seq
+        ))
         return order
 
-    def get_item_by_id(self, item_id: int) -> Optional[OrderItem]:
-        return self.session.query(OrderItem).filter(OrderItem.id == item_id).first()
+    async def _apply_change(self, order: Order, delta_cents: int) -> int:
+        """
+        Adjust the stored total in a single UPDATE, conditional on the loaded
+        version, so the items collection never has to be summed. The same
+        statement bumps the version and stamps the change; returns its
+        sequence number. Raises ValueError instead of pushing the total past
+        what the INTEGER column holds.
+        """
+        if max(abs(delta_cents), abs(order.price_cents + delta_cents)) > MAX_CENTS:
+            raise ValueError(f"Order {order.id} total would be out of range")
+        stmt = (
+            update(Order)
+            .where(Order.id == order.id, Order.version == order.version)
+            .values(
+                price_cents=Order.price_cents + delta_cents,
+                version=Order.version + 1
+            )
+            .returning(
+                Order.price_cents, Order.updated_at, Order.change_seq, Order.version
+            )
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.session.execute(stmt)).one_or_none()
+        if row is None:
+            raise ConcurrentUpdateError(f"Order {order.id} was changed concurrently")
+        for key, value in row._mapping.items():
+            set_committed_value(order, key, value)
+        return row.change_seq
+
+    async def _next_change_seq(self) -> int:
+        """
+        Next change sequence number, for bulk writes that number many rows
+        consecutively from it within the same transaction.
+        """
+        return await self.session.scalar(select(NEXT_CHANGE_SEQ))
+
+    async def iter_export(
+        self,
+        status: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        chunk_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """
+        Stream orders with their items as plain dicts, ordered by id, optionally
+        limited to orders created in [created_from, created_to).
+        Rows are fetched `chunk_size` at a time from one joined query, so memory
+        stays flat no matter how many orders exist.
+        """
+        stmt = (
+            select(
+                Order.id, Order.user_id, Order.status, Order.price_cents,
+                OrderItem.id.label("item_id"), OrderItem.amount, OrderItem.flavor,
+                OrderItem.size, OrderItem.unit_price_cents
+            )
+            .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+            .order_by(Order.id, OrderItem.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        if status is not None:
+            stmt = stmt.where(Order.status == status)
+        if created_from is not None:
+            stmt = stmt.where(Order.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(Order.created_at < created_to)
+
+        current = None
+        result = await self.session.stream(stmt)
+        async for row in result:
+            if current is None or current["id"] != row.id:
+                if current is not None:
+                    yield current
+                current = {
+                    "id": row.id,
+                    "user_id": row.user_id,
+                    "status": row.status,
+                    "price_cents": row.price_cents,
+                    "items": [],
+                }
+            if row.item_id is not None:
+                current["items"].append({
+                    "id": row.item_id,
+                    "amount": row.amount,
+                    "flavor": row.flavor,
+                    "size": row.size,
+                    "unit_price_cents": row.unit_price_cents,
+                })
+        if current is not None:
+            yield current
+
+    async def get_changes(
+        self,
+        since: int,
+        limit: int,
+        user_id: Optional[int] = None
+    ) -> Tuple[List[Order], List[OrderItemTombstone]]:
+        """
+        Orders changed after sequence number `since`, oldest change first, plus the
+        tombstones of items deleted in the same range. When the page is full the
+        tombstones stop at its last order so the next page does not skip any.
+        """
+        stmt = (
+            select(Order)
+            .options(ORDER_ITEMS_LOADER)
+            .where(Order.change_seq > since)
+        )
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        orders = list(await self.session.scalars(
+            stmt.order_by(Order.change_seq).limit(limit)
+        ))
+
+        tombstone_seq = OrderItemTombstone.change_seq
+        tombstones = select(OrderItemTombstone).where(tombstone_seq > since)
+        if len(orders) == limit:
+            tombstones = tombstones.where(tombstone_seq <= orders[-1].change_seq)
+        if user_id is not None:
+            tombstones = (
+                tombstones
+                .join(Order, Order.id == OrderItemTombstone.order_id)
+                .where(Order.user_id == user_id)
+            )
+        tombstones = tombstones.order_by(tombstone_seq)
+        return orders, list(await self.session.scalars(tombstones))
+
+    async def existing_user_ids(self, user_ids: Iterable[int]) -> Set[int]:
+        ids = set(user_ids)
+        if not ids:
+            return set()
+        return set(await self.session.scalars(
+            select(User.id).where(User.id.in_(ids))
+        ))
+
+    async def bulk_insert_orders(self, orders: List[dict]) -> List[int]:
+        """
+        Stage a chunk of orders and their items: one multi-row INSERT for the
+        orders, one executemany INSERT for the items, and one UPDATE computing
+        every total in SQL. Returns the new order ids in input order.
+        """
+        if not orders:
+            return []
+        first_seq = await self._next_change_seq()
+        order_ids = list(await self.session.scalars(
+            insert(Order).returning(Order.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": order["user_id"],
+                    "status": order["status"],
+                    "price_cents": 0,
+                    "change_seq": first_seq + i
+                }
+                for i, order in enumerate(orders)
+            ]
+        ))
+        item_rows = [
+            {**item, "order_id": order_id}
+            for order_id, order in zip(order_ids, orders)
+            for item in order["items"]
+        ]
+        if item_rows:
+            await self.session.execute(insert(OrderItem), item_rows)
+            await self.session.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids))
+                # Keep the numbers assigned above instead of stamping one for all
+                .values(
+                    price_cents=self._items_total_subquery(),
+                    change_seq=Order.change_seq
+                )
+                .execution_options(synchronize_session=False)
+            )
+        return order_ids
+
+    def _items_total_subquery(self):
+        line_total = OrderItem.amount * OrderItem.unit_price_cents
+        return (
+            select(func.coalesce(func.sum(line_total), 0))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+
+    async def find_price_drift(self) -> List[Tuple[int, int, int]]:
+        """
+        Return (order_id, stored_cents, computed_cents) for every order whose stored
+        total differs from the sum of its items, computed in one SQL statement.
+        """
+        computed = self._items_total_subquery()
+        stmt = (
+            select(Order.id, Order.price_cents, computed)
+            .where(Order.price_cents != computed)
+            .order_by(Order.id)
+        )
+        return [tuple(row) for row in await self.session.execute(stmt)]
+
+    async def fix_price_drift(self) -> int:
+        """
+        Rewrite drifted totals from their items in bulk; returns the number of
+        orders fixed. Each fixed order gets its own change sequence number.
+        """
+        computed = self._items_total_subquery()
+        drifted = list(await self.session.scalars(
+            select(Order.id).where(Order.price_cents != computed).order_by(Order.id)
+        ))
+        if not drifted:
+            return 0
+        first_seq = await self._next_change_seq()
+        orders = Order.__table__
+        stmt = (
+            update(orders)
+            .where(orders.c.id == bindparam("order_id"))
+            .values(
+                price_cents=computed,
+                change_seq=bindparam("seq"),
+                version=orders.c.version + 1
+            )
+        )
+        await self.session.execute(stmt, [
+            {"order_id": order_id, "seq": first_seq + i}
+            for i, order_id in enumerate(drifted)
+        ])
+        return len(drifted)
+
+
+class AsyncSQLAlchemyOrderReadRepository(AsyncOrderReadRepositoryInterface):
+    """
+    Read-only order queries that select plain rows through Core and map them
+    into OrderEntity snapshots, skipping the identity map and change tracking.
+    Each call is a single statement: the order page joined with its items.
+    """
+    ORDER_COLUMNS = (
+        Order.id, Order.user_id, Order.status, Order.price_cents,
+        Order.created_at, Order.updated_at, Order.change_seq, Order.closed_at,
+        Order.version,
+    )
+    ITEM_COLUMNS = (
+        OrderItem.id.label("item_id"), OrderItem.amount, OrderItem.flavor,
+        OrderItem.size, OrderItem.unit_price_cents,
+    )
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, order_id: int) -> Optional[OrderEntity]:
+        orders = await self._fetch(
+            select(*self.ORDER_COLUMNS).where(Order.id == order_id)
+        )
+        return orders[0] if orders else None
+
+    async def get_page(
+        self,
+        limit: int,
+        cursor: Optional[int] = None,
+        user_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> List[OrderEntity]:
+        """
+        Keyset page of orders, newest first: returns up to `limit` orders
+        with id < cursor.
+        """
+        stmt = select(*self.ORDER_COLUMNS)
+        if user_id is not None:
+            stmt = stmt.where(Order.user_id == user_id)
+        if status is not None:
+            stmt = stmt.where(Order.status == status)
+        if cursor is not None:
+            stmt = stmt.where(Order.id < cursor)
+        return await self._fetch(stmt.order_by(Order.id.desc()).limit(limit))
+
+    async def _fetch(self, orders_stmt) -> List[OrderEntity]:
+        """
+        Join the selected orders with their items and map the rows into
+        entities, newest order first and items in insertion order.
+        """
+        page = orders_stmt.subquery()
+        stmt = (
+            select(page, *self.ITEM_COLUMNS)
+            .outerjoin(OrderItem, OrderItem.order_id == page.c.id)
+            .order_by(page.c.id.desc(), OrderItem.id)
+        )
+        orders: List[OrderEntity] = []
+        items: List[OrderItemEntity] = []
+        current = None
+        for row in await self.session.execute(stmt):
+            if current is None or current.id != row.id:
+                if current is not None:
+                    orders.append(self._with_items(current, items))
+                current, items = row, []
+            if row.item_id is not None:
+                items.append(OrderItemEntity(
+                    id=row.item_id,
+                    amount=row.amount,
+                    flavor=row.flavor,
+                    size=row.size,
+                    unit_price_cents=row.unit_price_cents,
+                    order_id=row.id,
+                ))
+        if current is not None:
+            orders.append(self._with_items(current, items))
+        return orders
+
+    @staticmethod
+    def _with_items(row, items: List[OrderItemEntity]) -> OrderEntity:
+        return OrderEntity(
+            id=row.id,
+            user_id=row.user_id,
+            status=row.status,
+            price_cents=row.price_cents,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            change_seq=row.change_seq,
+            closed_at=row.closed_at,
+            version=row.version,
+            items=tuple(items),
+        )
+
+class AsyncSQLAlchemySalesReportRepository(SalesReportRepositoryInterface):
+    """
+    Maintains and queries the sales rollup tables (sales_daily, sales_daily_item).
+    Writes are staged on the shared session and committed with the order change.
+    """
+    CLOSED_STATUSES = ("FINISHED", "CANCELED")
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def record_order(
+        self,
+        order: Order,
+        status: str,
+        day: date,
+        sign: int = 1
+    ) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) one closed order from the rollups
+        of `day`.
+        """
+        daily_table = DailySales.__table__
+        daily = sqlite_insert(daily_table).values(
+            day=day,
+            status=status,
+            order_count=sign,
+            revenue_cents=sign * order.price_cents
+        )
+        daily = daily.on_conflict_do_update(
+            index_elements=["day", "status"],
+            set_={
+                "order_count":
+                    daily_table.c.order_count + daily.excluded.order_count,
+                "revenue_cents":
+                    daily_table.c.revenue_cents + daily.excluded.revenue_cents,
+            }
+        )
+        await self.session.execute(daily)
+
+        totals = defaultdict(lambda: [0, 0])
+        for item in order.items:
+            bucket = totals[(item.flavor, item.size)]
+            bucket[0] += sign * item.amount
+            bucket[1] += sign * item.total_cents
+        if not totals:
+            return
+        items_table = DailyItemSales.__table__
+        items = sqlite_insert(items_table)
+        items = items.on_conflict_do_update(
+            index_elements=["day", "status", "flavor", "size"],
+            set_={
+                "quantity": items_table.c.quantity + items.excluded.quantity,
+                "revenue_cents":
+                    items_table.c.revenue_cents + items.excluded.revenue_cents,
+            }
+        )
+        await self.session.execute(items, [
+            {
+                "day": day,
+                "status": status,
+                "flavor": flavor,
+                "size": size,
+                "quantity": quantity,
+                "revenue_cents": revenue
+            }
+            for (flavor, size), (quantity, revenue) in totals.items()
+        ])
+
+    async def rebuild(self) -> Tuple[int, int]:
+        """
+        Recompute both rollup tables from orders and items with INSERT ... SELECT.
+        Returns (orders rolled up, closed orders skipped for lacking closed_at).
+        """
+        # business_day() is registered on every connection by configure_sqlite_engine
+        day = func.business_day(Order.closed_at)
+        closed = Order.status.in_(self.CLOSED_STATUSES)
+
+        await self.session.execute(delete(DailySales.__table__))
+        await self.session.execute(delete(DailyItemSales.__table__))
+        await self.session.execute(
+            insert(DailySales.__table__).from_select(
+                ["day", "status", "order_count", "revenue_cents"],
+                select(day, Order.status, func.count(), func.sum(Order.price_cents))
+                .where(closed, Order.closed_at.is_not(None))
+                .group_by(day, Order.status)
+            )
+        )
+        await self.session.execute(
+            insert(DailyItemSales.__table__).from_select(
+                ["day", "status", "flavor", "size", "quantity", "revenue_cents"],
+                select(
+                    day, Order.status, OrderItem.flavor, OrderItem.size,
+                    func.sum(OrderItem.amount),
+                    func.sum(OrderItem.amount * OrderItem.unit_price_cents)
+                )
+                .join(Order, Order.id == OrderItem.order_id)
+                .where(closed, Order.closed_at.is_not(None))
+                .group_by(day, Order.status, OrderItem.flavor, OrderItem.size)
+            )
+        )
+        rolled_up = await self.session.scalar(
+            select(func.coalesce(func.sum(DailySales.order_count), 0))
+        )
+        skipped = await self.session.scalar(
+            select(func.count())
+            .select_from(Order)
+            .where(closed, Order.closed_at.is_(None))
+        )
+        return rolled_up, skipped
+
+    async def daily_revenue(self, start: date, end: date, status: str) -> List[dict]:
+        stmt = (
+            select(DailySales.day, DailySales.order_count, DailySales.revenue_cents)
+            .where(DailySales.day.between(start, end), DailySales.status == status)
+            .order_by(DailySales.day)
+        )
+        return [dict(row._mapping) for row in await self.session.execute(stmt)]
+
+    async def item_breakdown(
+        self,
+        start: date,
+        end: date,
+        status: str,
+        group_by: str,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Quantity and revenue per flavor or per size over a date range.
+        """
+        columns = {"flavor": DailyItemSales.flavor, "size": DailyItemSales.size}
+        column = columns[group_by]
+        quantity = func.sum(DailyItemSales.quantity).label("quantity")
+        revenue = func.sum(DailyItemSales.revenue_cents).label("revenue_cents")
+        stmt = (
+            select(column, quantity, revenue)
+            .where(
+                DailyItemSales.day.between(start, end),
+                DailyItemSales.status == status
+            )
+            .group_by(column)
+            .order_by(revenue.desc(), column)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in await self.session.execute(stmt)]
 
-    def delete_item(self, item: OrderItem) -> None:
-        self.session.delete(item)
-        self.session.commit()
+    async def status_breakdown(self, start: date, end: date) -> List[dict]:
+        stmt = (
+            select(
+                DailySales.status,
+                func.sum(DailySales.order_count).label("order_count"),
+                func.sum(DailySales.revenue_cents).label("revenue_cents")
+            )
+            .where(DailySales.day.between(start, end))
+            .group_by(DailySales.status)
+            .order_by(DailySales.status)
+        )
+        return [dict(row._mapping) for row in await self.session.execute(stmt)]
@@ -0,0 +1,107 @@
+import asyncio
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy.exc import DBAPIError
+
+from src.config import settings
+from src.infrastructure.metrics import (
+    db_busy_failures_total,
+    db_busy_retries_total,
+    db_lock_wait_seconds,
+    db_transaction_attempts,
+    db_transaction_seconds,
+)
+
+T = TypeVar("T")
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+def is_busy_error(exc: BaseException) -> bool:
+    """
+    True when SQLite refused the statement because another connection holds a
+    lock (SQLITE_BUSY and SQLITE_LOCKED, including extended codes such as
+    SQLITE_BUSY_SNAPSHOT). These succeed when the transaction is run again;
+    every other error is a real failure.
+    """
+    if isinstance(exc, DBAPIError):
+        exc = exc.orig
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended result codes keep the primary code in the low byte
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    return "database is locked" in str(exc) or "database table is locked" in str(exc)
+
+
+@dataclass(frozen=True, slots=True)
+class BusyRetryPolicy:
+    """
+    Re-runs a whole transaction when SQLite reports busy/locked, sleeping a
+    random delay up to base_delay * 2**retry (capped at max_delay) between
+    attempts, and gives up with the last error once `deadline` seconds have
+    passed. Delays are in seconds.
+    """
+    base_delay: float
+    max_delay: float
+    deadline: float
+
+    def backoff(self, retry: int) -> float:
+        # Full jitter: competing writers spread out instead of retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    async def run(self, operation: str, transaction: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `transaction()` until it does not fail with a busy error. It must
+        open and finish its own transaction so each attempt starts clean.
+        `operation` labels the metrics.
+        """
+        start = time.perf_counter()
+        attempts = 0
+        while True:
+            attempt_start = time.perf_counter()
+            attempts += 1
+            try:
+                result = await transaction()
+            except Exception as exc:
+                if not is_busy_error(exc):
+                    self._observe(operation, attempts, start, attempt_start)
+                    raise
+                delay = self.backoff(attempts - 1)
+                if time.perf_counter() + delay - start > self.deadline:
+                    db_busy_failures_total.inc(operation)
+                    self._observe(operation, attempts, start, time.perf_counter())
+                    raise
+                db_busy_retries_total.inc(operation)
+                await asyncio.sleep(delay)
+                continue
+            self._observe(operation, attempts, start, attempt_start)
+            return result
+
+    @staticmethod
+    def _observe(
+        operation: str,
+        attempts: int,
+        start: float,
+        waited_until: float
+    ) -> None:
+        """
+        Lock wait only counts failed attempts and backoff; waits that
+        busy_timeout absorbed within an attempt show in the total duration.
+        """
+        db_transaction_attempts.observe(attempts, operation)
+        db_lock_wait_seconds.observe(waited_until - start, operation)
+        db_transaction_seconds.observe(time.perf_counter() - start, operation)
+
+
+busy_retry = BusyRetryPolicy(
+    base_delay=settings.DB_BUSY_RETRY_BASE_DELAY_MS / 1000,
+    max_delay=settings.DB_BUSY_RETRY_MAX_DELAY_MS / 1000,
+    deadline=settings.DB_BUSY_RETRY_DEADLINE_SECONDS
+)
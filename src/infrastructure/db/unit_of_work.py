@@ -0,0 +1,17 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.domain.interfaces import UnitOfWorkInterface
+
+
+class AsyncSQLAlchemyUnitOfWork(UnitOfWorkInterface):
+    """
+    Commits or rolls back the AsyncSession shared with the request's repositories.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
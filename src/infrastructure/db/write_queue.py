@@ -0,0 +1,190 @@
+import asyncio
+import contextvars
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker
+
+from src.domain.interfaces import OrderEventPublisherInterface, UnitOfWorkInterface
+from src.infrastructure.db.retry import BusyRetryPolicy, busy_retry
+from src.infrastructure.db.unit_of_work import AsyncSQLAlchemyUnitOfWork
+from src.infrastructure.events import DeferredOrderEventPublisher
+from src.infrastructure.metrics import write_batch_size
+
+# Builds the use case a job runs against from the job's session, its unit of
+# work and the publisher its events must go through
+UseCaseBuilder = Callable[
+    [AsyncSession, UnitOfWorkInterface, OrderEventPublisherInterface], Any
+]
+Operation = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class _Job:
+    operation: Operation
+    future: asyncio.Future
+    # Context of the submitting request, so its profile sees the job's SQL
+    context: contextvars.Context
+    events: Optional[DeferredOrderEventPublisher] = None
+    result: Any = None
+    error: Optional[BaseException] = None
+
+
+class GroupCommitWriter:
+    """
+    Single writer for order mutations. Jobs are queued in process and run one
+    after the other on one connection; the jobs queued while the previous group
+    ran, plus those arriving within `window` seconds (at most `max_batch`),
+    share one transaction and one COMMIT, so concurrent writers stop queuing on
+    SQLite's database lock and pay one fsync per group.
+
+    Each job runs in its own SAVEPOINT with its own session joined to the
+    group's connection, so jobs never share ORM state. A job that raises is
+    rolled back alone and its caller gets the exception while the others still
+    commit. If the COMMIT itself fails every job of the group gets that error.
+    A group that fails with a busy/locked error is run again as a whole under
+    `retry`. Events are published only once the group is committed.
+
+    Bound to the event loop it is used from; the worker task only runs while
+    jobs are queued.
+    """
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        build: UseCaseBuilder,
+        events: OrderEventPublisherInterface,
+        window: float,
+        max_batch: int,
+        retry: BusyRetryPolicy = busy_retry
+    ):
+        self.session_factory = session_factory
+        self.build = build
+        self.events = events
+        self.window = window
+        self.max_batch = max_batch
+        self.retry = retry
+        self._queue: Deque[_Job] = deque()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, operation: Operation) -> Any:
+        """
+        Run `operation(use_case)` in the next group and return its result once
+        the group is committed, or raise its exception.
+        """
+        loop = asyncio.get_running_loop()
+        job = _Job(operation, loop.create_future(), contextvars.copy_context())
+        self._queue.append(job)
+        if self._worker is None or self._worker.done():
+            # A fresh context keeps the batch's own statements (BEGIN, COMMIT)
+            # out of the first submitter's profile
+            self._worker = loop.create_task(self._run(), context=contextvars.Context())
+        return await job.future
+
+    async def _run(self) -> None:
+        while self._queue:
+            if len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.window)
+            size = min(len(self._queue), self.max_batch)
+            batch = [self._queue.popleft() for _ in range(size)]
+            # Callers that went away before their turn are skipped
+            batch = [job for job in batch if not job.future.done()]
+            if batch:
+                await self._commit_batch(batch)
+
+    async def _commit_batch(self, batch: List[_Job]) -> None:
+        write_batch_size.observe(len(batch))
+        try:
+            await self.retry.run("group_commit", lambda: self._attempt_batch(batch))
+        except Exception as exc:
+            for job in batch:
+                job.error = job.error or exc
+                job.events = None
+
+        for job in batch:
+            if job.future.done():
+                continue
+            if job.error is not None:
+                job.future.set_exception(job.error)
+            else:
+                job.events.flush()
+                job.future.set_result(job.result)
+
+    async def _attempt_batch(self, batch: List[_Job]) -> None:
+        async with self.session_factory.kw["bind"].connect() as connection:
+            await _begin_write(connection)
+            for job in batch:
+                job.events = DeferredOrderEventPublisher(self.events)
+                job.result, job.error = None, None
+                try:
+                    job.result = await asyncio.create_task(
+                        self._run_job(connection, job), context=job.context
+                    )
+                except Exception as exc:
+                    job.error = exc
+            if any(job.error is None for job in batch):
+                await connection.commit()
+            else:
+                await connection.rollback()
+
+    async def _run_job(self, connection: AsyncConnection, job: _Job) -> Any:
+        savepoint = await connection.begin_nested()
+        try:
+            # create_savepoint: the job's units of work commit and roll back a
+            # SAVEPOINT of their own inside the job's, so a use case can roll
+            # back and retry without losing the job's savepoint
+            async with self.session_factory(
+                bind=connection, join_transaction_mode="create_savepoint"
+            ) as session:
+                uow = AsyncSQLAlchemyUnitOfWork(session)
+                result = await job.operation(self.build(session, uow, job.events))
+        except Exception:
+            if savepoint.is_active:
+                await savepoint.rollback()
+            raise
+        await savepoint.commit()
+        return result
+
+
+class DirectWriter:
+    """
+    Per-request commit path with the GroupCommitWriter interface: every job
+    gets its own session and transaction and publishes its events directly.
+    A job failing with a busy/locked error is run again under `retry`.
+    """
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        build: UseCaseBuilder,
+        events: OrderEventPublisherInterface,
+        retry: BusyRetryPolicy = busy_retry
+    ):
+        self.session_factory = session_factory
+        self.build = build
+        self.events = events
+        self.retry = retry
+
+    async def submit(self, operation: Operation) -> Any:
+        async def attempt():
+            async with self.session_factory() as session:
+                uow = AsyncSQLAlchemyUnitOfWork(session)
+                return await operation(self.build(session, uow, self.events))
+
+        return await self.retry.run("order_write", attempt)
+
+
+# Either writer; routes only call `submit`
+OrderWriter = Union[GroupCommitWriter, DirectWriter]
+
+
+async def _begin_write(connection: AsyncConnection) -> None:
+    """
+    Open the group's transaction explicitly. pysqlite/aiosqlite only send BEGIN
+    before the first DML statement, so the first SAVEPOINT would otherwise start
+    the transaction and its RELEASE would commit it. IMMEDIATE also takes the
+    write lock up front instead of failing to upgrade halfway through a group.
+    """
+    if connection.dialect.name == "sqlite":
+        await connection.exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        await connection.begin()
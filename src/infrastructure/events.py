@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from src.config import settings
+from src.domain.interfaces import OrderEventPublisherInterface
+from src.infrastructure.db.models import Order
+
+
+@dataclass(frozen=True, slots=True)
+class OrderEvent:
+    id: int
+    type: str
+    order_id: int
+    user_id: int
+    data: dict = field(default_factory=dict)
+
+
+class Subscription:
+    """
+    One consumer of the bus. Events are buffered in a bounded queue; a consumer
+    that falls `queue_size` events behind is dropped instead of slowing publishers
+    and must reconnect with its last event id.
+    """
+    def __init__(
+        self,
+        bus: "OrderEventBus",
+        predicate: Callable[[OrderEvent], bool],
+        queue_size: int
+    ):
+        self.bus = bus
+        self.predicate = predicate
+        self.queue: asyncio.Queue[OrderEvent] = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+        # True when the requested resume point is no longer in the history
+        self.missed_events = False
+
+    def offer(self, event: OrderEvent) -> None:
+        if self.lagged or not self.predicate(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+            self.bus.unsubscribe(self)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[OrderEvent]:
+        """
+        Next event, or None on timeout. Raises ConnectionAbortedError once the
+        buffered events are drained after the subscription lagged.
+        """
+        if self.lagged and self.queue.empty():
+            raise ConnectionAbortedError("Subscriber fell too far behind")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class OrderEventBus(OrderEventPublisherInterface):
+    """
+    In-process pub/sub for order changes with a replay buffer for resuming streams.
+    Single event loop only: publish and subscribe must run on the loop serving requests.
+    """
+    def __init__(self, history_size: int, queue_size: int):
+        self.queue_size = queue_size
+        self._history: deque[OrderEvent] = deque(maxlen=history_size)
+        self._subscribers: set[Subscription] = set()
+        self._last_id = 0
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, order: Order, **data) -> OrderEvent:
+        self._last_id += 1
+        event = OrderEvent(
+            id=self._last_id,
+            type=event_type,
+            order_id=order.id,
+            user_id=order.user_id,
+            data={"status": order.status, "price_cents": order.price_cents, **data},
+        )
+        self._history.append(event)
+        for subscription in list(self._subscribers):
+            subscription.offer(event)
+        return event
+
+    def subscribe(
+        self,
+        predicate: Callable[[OrderEvent], bool] = lambda event: True,
+        last_event_id: Optional[int] = None
+    ) -> Subscription:
+        """
+        Register a consumer. With `last_event_id`, matching events published after
+        it are replayed first when they are still in the history.
+        """
+        subscription = Subscription(self, predicate, self.queue_size)
+        if last_event_id is not None:
+            oldest = self._history[0].id if self._history else self._last_id + 1
+            if last_event_id > self._last_id or last_event_id < oldest - 1:
+                subscription.missed_events = True
+            else:
+                for event in self._history:
+                    if event.id > last_event_id:
+                        subscription.offer(event)
+        if not subscription.lagged:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+
+class DeferredOrderEventPublisher(OrderEventPublisherInterface):
+    """
+    Holds the events of a job whose transaction is committed later by someone
+    else (see GroupCommitWriter) and publishes them on `flush`. The order's
+    status and total are captured when the event is raised.
+    """
+    def __init__(self, bus: OrderEventPublisherInterface):
+        self.bus = bus
+        self._pending: list[tuple[str, Order, dict]] = []
+
+    def publish(self, event_type: str, order: Order, **data) -> None:
+        snapshot = {"status": order.status, "price_cents": order.price_cents, **data}
+        self._pending.append((event_type, order, snapshot))
+
+    def flush(self) -> None:
+        for event_type, order, data in self._pending:
+            self.bus.publish(event_type, order, **data)
+        self._pending.clear()
+
+
+order_events = OrderEventBus(
+    settings.ORDER_EVENT_HISTORY_SIZE, settings.ORDER_EVENT_QUEUE_SIZE
+)
@@ -0,0 +1,248 @@
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow bcrypt calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+def _format_sample(
+    name: str, labelnames: Sequence[str], labels: Sequence[str], value: float
+) -> str:
+    return f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels. Label values are passed positionally.
+    """
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            _format_sample(self.name, self.labelnames, labels, value)
+            for labels, value in values
+        ]
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed buckets, rendered with _bucket/_sum/_count series.
+    """
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, amount: float, *labelvalues: str) -> None:
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += amount
+
+    def count(self, *labelvalues: str) -> int:
+        state = self._values.get(labelvalues)
+        return sum(state[0]) if state else 0
+
+    def sum(self, *labelvalues: str) -> float:
+        state = self._values.get(labelvalues)
+        return state[1] if state else 0.0
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._values.items()
+            ]
+        lines = []
+        names = self.labelnames + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket = _format_labels(names, labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            series = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series} {repr(total)}")
+            lines.append(f"{self.name}_count{series} {cumulative}")
+        return lines
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose samples are read from `callback` at scrape time, so
+    the value costs nothing to maintain. The callback yields (label values,
+    value) pairs.
+    """
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge"
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.type = type
+
+    def collect(self) -> List[str]:
+        return [
+            _format_sample(self.name, self.labelnames, labels, value)
+            for labels, value in self.callback()
+        ]
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text exposition format.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]],
+        labelnames: Sequence[str] = (),
+        type: str = "gauge"
+    ) -> CallbackMetric:
+        return self.register(
+            CallbackMetric(name, documentation, callback, labelnames, type)
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            help_text = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response body is sent",
+    ("method", "route")
+)
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the pool"
+)
+password_hash_duration_seconds = registry.histogram(
+    "password_hash_duration_seconds", "Time spent inside bcrypt per call",
+    ("operation",), buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+password_hash_rejected_total = registry.counter(
+    "password_hash_rejected_total",
+    "Hashing requests refused because the worker pool was saturated"
+)
+write_batch_size = registry.histogram(
+    "write_batch_size", "Order mutations committed together by the group-commit writer",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+db_busy_retries_total = registry.counter(
+    "db_busy_retries_total",
+    "Transactions retried after SQLite reported the database busy or locked",
+    ("operation",)
+)
+db_busy_failures_total = registry.counter(
+    "db_busy_failures_total",
+    "Transactions abandoned because the database stayed locked past the retry deadline",
+    ("operation",)
+)
+db_transaction_attempts = registry.histogram(
+    "db_transaction_attempts",
+    "Attempts needed per transaction, including the successful one",
+    ("operation",), buckets=(1, 2, 3, 5, 8, 13)
+)
+db_lock_wait_seconds = registry.histogram(
+    "db_lock_wait_seconds",
+    "Time per transaction lost to busy/locked errors and retry backoff",
+    ("operation",)
+)
+# SQLite's busy_timeout waits for the lock inside a statement without raising,
+# so only the whole transaction's wall time shows those waits
+db_transaction_seconds = registry.histogram(
+    "db_transaction_seconds",
+    "Wall time per retried transaction: every attempt, busy_timeout waits and backoff",
+    ("operation",)
+)
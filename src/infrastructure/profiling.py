@@ -0,0 +1,61 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import settings
+
+
+@dataclass(slots=True)
+class RequestProfile:
+    """
+    Time spent by one request in the database and in password hashing.
+    Durations are in seconds.
+    """
+    statement_count: int = 0
+    db_time: float = 0.0
+    hash_time: float = 0.0
+    slowest: Optional[Tuple[float, str]] = None
+    # (duration, sql) of the first SLOW_REQUEST_MAX_STATEMENTS statements
+    statements: List[Tuple[float, str]] = field(default_factory=list)
+
+    def record_statement(self, duration: float, statement: str) -> None:
+        self.statement_count += 1
+        self.db_time += duration
+        if self.slowest is None or duration > self.slowest[0]:
+            self.slowest = (duration, statement)
+        if len(self.statements) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+            self.statements.append((duration, statement))
+
+
+# Set by ProfilingMiddleware for the duration of a request; None outside requests
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Record every statement of `engine` into the current request's profile.
+    Pass `async_engine.sync_engine` for async engines; SQLAlchemy runs their
+    sync events in the calling task's context, so the profile is visible.
+    """
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        if current_profile.get() is not None:
+            # Statements on one connection never overlap, so one slot is enough
+            conn.info["profile_start"] = time.perf_counter()
+
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        profile = current_profile.get()
+        start = conn.info.pop("profile_start", None)
+        if profile is not None and start is not None:
+            profile.record_statement(time.perf_counter() - start, statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
@@ -1,7 +1,43 @@
-import bcrypt
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+
+import bcrypt
 import jwt
+
 from src.config import settings
+from src.infrastructure.cache import TTLCache
+from src.infrastructure.metrics import (
+    password_hash_duration_seconds,
+    password_hash_rejected_total,
+    registry,
+)
+from src.infrastructure.profiling import current_profile
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """
+    Raised when the password hashing pool already holds BCRYPT_MAX_PENDING jobs.
+    """
+
+
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_lock = threading.Lock()
+_pending_hash_jobs = 0
+
+# Maps sha256(token) -> user_id for tokens whose signature was already checked
+token_cache = TTLCache(
+    settings.TOKEN_CACHE_MAX_SIZE, settings.TOKEN_CACHE_TTL_SECONDS, name="token"
+)
+
+registry.callback(
+    "password_hash_pending",
+    "bcrypt jobs queued or running on the hashing pool",
+    lambda: [((), _pending_hash_jobs)]
+)
 
 def hash_password(password: str) -> str:
     """
@@ -9,7 +45,7 @@ def hash_password(password: str) -> str:
     Truncates to 72 bytes to maintain compatibility with standard bcrypt limitations.
     """
     pw_bytes = password[:72].encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     return bcrypt.hashpw(pw_bytes, salt).decode('utf-8')
 
 def verify_password(password: str, hashed_password: str) -> bool:
@@ -24,6 +60,70 @@ def verify_password(password: str, hashed_password: str) -> bool:
         # Fallback in case hash format is invalid or has legacy passlib schemes
         return False
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.BCRYPT_POOL_SIZE,
+            thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+def _timed_hash_call(operation: str, func, *args):
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        password_hash_duration_seconds.observe(time.perf_counter() - start, operation)
+
+async def _run_in_hash_pool(operation: str, func, *args):
+    """
+    Run a bcrypt call on the hashing pool, refusing work once the queue is full.
+    bcrypt releases the GIL, so threads give real parallelism here.
+    """
+    global _pending_hash_jobs
+    with _hash_lock:
+        if _pending_hash_jobs >= settings.BCRYPT_MAX_PENDING:
+            password_hash_rejected_total.inc()
+            raise PasswordHashingBusyError("Password hashing pool is saturated")
+        _pending_hash_jobs += 1
+        executor = _get_hash_executor()
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, _timed_hash_call, operation, func, *args
+        )
+    finally:
+        with _hash_lock:
+            _pending_hash_jobs -= 1
+        profile = current_profile.get()
+        if profile is not None:
+            # Includes time queued behind other hashing jobs
+            profile.hash_time += time.perf_counter() - start
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt worker pool.
+    """
+    return await _run_in_hash_pool("hash", hash_password, password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the bcrypt worker pool.
+    """
+    return await _run_in_hash_pool("verify", verify_password, password, hashed_password)
+
+def shutdown_hash_executor() -> None:
+    """
+    Stop the bcrypt worker pool, waiting for running jobs to finish.
+    """
+    global _hash_executor
+    with _hash_lock:
+        executor, _hash_executor = _hash_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
 def create_access_token(user_id: int, expires_delta: timedelta | None = None) -> str:
     """
     Generate a JWT access token for a user.
@@ -43,12 +143,21 @@ def decode_access_token(token: str) -> int | None:
     """
     Decode and validate a JWT access token.
     Returns the user_id (sub) if valid, otherwise None.
+    Verified tokens are cached until their `exp`, so repeat callers skip the HMAC check.
     """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached_user_id = token_cache.get(digest)
+    if cached_user_id is not None:
+        return cached_user_id
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id = payload.get("sub")
         if user_id is None:
             return None
-        return int(user_id)
+        user_id = int(user_id)
     except (jwt.PyJWTError, ValueError):
         return None
+    expires_at = payload.get("exp")
+    ttl = expires_at - time.time() if isinstance(expires_at, (int, float)) else None
+    token_cache.set(digest, user_id, ttl_seconds=ttl)
+    return user_id
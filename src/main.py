@@ -1,16 +1,94 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import OperationalError
+
+from src.domain.interfaces import ConcurrentUpdateError, OrderVersionMismatchError
+from src.infrastructure.db.retry import is_busy_error
+from src.infrastructure.metrics import registry
+from src.infrastructure.security import shutdown_hash_executor
+from src.presentation.middleware import MetricsMiddleware, ProfilingMiddleware
 from src.presentation.routers.auth import auth_router
 from src.presentation.routers.order import order_router
+from src.presentation.routers.reports import report_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_hash_executor()
 
 app = FastAPI(
     title="Restaurant System API",
     description="Refactored RESTful API for restaurant management using Clean Architecture.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(RequestValidationError)
+async def validation_error_handler(request: Request, exc: RequestValidationError):
+    """
+    FastAPI's default 422 body. JSON request bodies may contain Infinity and
+    NaN, which cannot be echoed back as JSON, so they are sent as strings.
+    """
+    detail = jsonable_encoder(exc.errors(), custom_encoder={float: _json_float})
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content={"detail": detail}
+    )
+
+def _json_float(value: float):
+    return value if math.isfinite(value) else str(value)
+
+@app.exception_handler(OperationalError)
+async def database_busy_handler(request: Request, exc: OperationalError):
+    """
+    A database that stayed locked past the retry deadline is overload, not a
+    bug: answer 503 so clients back off. Other operational errors stay 500.
+    """
+    if not is_busy_error(exc):
+        raise exc
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The database is busy, please retry shortly."},
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(OrderVersionMismatchError)
+async def version_mismatch_handler(request: Request, exc: OrderVersionMismatchError):
+    """
+    If-Match named a version the order is no longer at.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_412_PRECONDITION_FAILED, content={"detail": str(exc)}
+    )
+
+@app.exception_handler(ConcurrentUpdateError)
+async def concurrent_update_handler(request: Request, exc: ConcurrentUpdateError):
+    """
+    The order kept changing under the mutation through all its retries.
+    """
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)}
+    )
+
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(order_router)
+app.include_router(report_router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Restaurant System API", "docs": "/docs"}
+
+@app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,129 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+from src.infrastructure.metrics import (
+    http_request_duration_seconds,
+    http_requests_total,
+)
+from src.infrastructure.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def is_streamed(message: Message) -> bool:
+    """
+    True for a body chunk with more to follow. Streamed responses (/order/events,
+    /order/export) last as long as the client keeps reading, so their duration
+    is not request latency.
+    """
+    return message["type"] == "http.response.body" and message.get("more_body", False)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and timing them per route template.
+    Unmatched paths share one label so scanners cannot blow up the series count.
+    Streamed responses are counted but not timed.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        streamed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streamed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            streamed = streamed or is_streamed(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope dict
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests_total.inc(method, route, str(status_code))
+            if not streamed:
+                elapsed = time.perf_counter() - start
+                http_request_duration_seconds.observe(elapsed, method, route)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware collecting a RequestProfile (SQL statements, DB time,
+    bcrypt time) per request. Requests slower than SLOW_REQUEST_THRESHOLD_MS are
+    logged with their SQL, except streamed responses; with SERVER_TIMING_ENABLED
+    the totals so far are sent in a Server-Timing header.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        start = time.perf_counter()
+        streamed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal streamed
+            streamed = streamed or is_streamed(message)
+            timed = settings.SERVER_TIMING_ENABLED
+            if message["type"] == "http.response.start" and timed:
+                timing = server_timing(profile, time.perf_counter() - start)
+                MutableHeaders(scope=message).append("Server-Timing", timing)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            elapsed = time.perf_counter() - start
+            slow = elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS
+            if slow and not streamed:
+                log_slow_request(scope, profile, elapsed)
+
+
+def server_timing(profile: RequestProfile, elapsed: float) -> str:
+    return (
+        f"db;dur={profile.db_time * 1000:.2f};"
+        f'desc="{profile.statement_count} queries", '
+        f"hash;dur={profile.hash_time * 1000:.2f}, "
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+
+def log_slow_request(scope: Scope, profile: RequestProfile, elapsed: float) -> None:
+    """
+    Log a slow request with its statements. Parameters are never logged since
+    they may hold credentials.
+    """
+    lines = [
+        f"Slow request {scope['method']} {scope['path']}: "
+        f"{elapsed * 1000:.1f}ms total, "
+        f"{profile.statement_count} statements in {profile.db_time * 1000:.1f}ms, "
+        f"password hashing {profile.hash_time * 1000:.1f}ms"
+    ]
+    if profile.slowest is not None:
+        duration, statement = profile.slowest
+        statement = " ".join(statement.split())
+        lines.append(f"  slowest ({duration * 1000:.1f}ms): {statement}")
+    for duration, statement in profile.statements:
+        lines.append(f"  {duration * 1000:8.2f}ms  {' '.join(statement.split())}")
+    if profile.statement_count > len(profile.statements):
+        lines.append(f"  ... {profile.statement_count - len(profile.statements)} more")
+    logger.warning("\n".join(lines))
@@ -0,0 +1,252 @@
+import csv
+import io
+import json
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Iterable, Tuple, Union
+
+from pydantic import ValidationError
+
+from src.domain.money import from_cents
+from src.infrastructure.db.models import Order, OrderItem
+from src.presentation.schemas import ImportOrderSchema
+
+# Flat layout used for CSV: one row per item, order columns repeated
+CSV_COLUMNS = [
+    "order_id", "user_id", "status", "price_cents",
+    "item_id", "amount", "flavor", "size", "unit_price_cents",
+]
+
+def item_to_dict(item: OrderItem) -> dict:
+    """
+    Same shape as OrderItemSchema, read straight from the ORM object.
+    """
+    return {
+        "id": item.id,
+        "amount": item.amount,
+        "flavor": item.flavor,
+        "size": item.size,
+        "unit_price_cents": item.unit_price_cents,
+        "unit_price": from_cents(item.unit_price_cents),
+    }
+
+def order_to_dict(order: Order) -> dict:
+    """
+    Same shape as ResponseOrderSchema, read straight from the ORM object so
+    responses skip model validation and jsonable_encoder.
+    """
+    return {
+        "id": order.id,
+        "status": order.status,
+        "price_cents": order.price_cents,
+        "created_at": order.created_at,
+        "updated_at": order.updated_at,
+        "change_seq": order.change_seq,
+        "version": order.version,
+        "items": [item_to_dict(item) for item in order.items],
+        "price": from_cents(order.price_cents),
+    }
+
+def order_to_ndjson(order: dict) -> str:
+    return json.dumps(order, separators=(",", ":")) + "\n"
+
+def event_to_sse(event) -> str:
+    """
+    Format an OrderEvent as a Server-Sent Events frame.
+    """
+    payload = {"order_id": event.order_id, "user_id": event.user_id, **event.data}
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+def order_to_csv_rows(order: dict) -> Iterable[list]:
+    head = [order["id"], order["user_id"], order["status"], order["price_cents"]]
+    if not order["items"]:
+        yield head + [None] * 5
+    for item in order["items"]:
+        yield head + [
+            item["id"],
+            item["amount"],
+            item["flavor"],
+            item["size"],
+            item["unit_price_cents"],
+        ]
+
+async def encode_orders(
+    orders: AsyncIterator[dict], fmt: str, batch_size: int = 200
+) -> AsyncIterator[str]:
+    """
+    Encode a stream of export dicts as NDJSON or CSV text, yielding one chunk per
+    `batch_size` orders so the response is not flushed one tiny write at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(CSV_COLUMNS)
+
+    pending = 0
+    async for order in orders:
+        if fmt == "csv":
+            writer.writerows(order_to_csv_rows(order))
+        else:
+            buffer.write(order_to_ndjson(order))
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+def _validate_import_row(data: dict) -> Union[dict, str]:
+    try:
+        return ImportOrderSchema.model_validate(data).to_import_row()
+    except ValidationError as e:
+        return _validation_message(e)
+    except (ValueError, ArithmeticError) as e:
+        # A conversion that failed outside pydantic's error handling
+        return f"row: {e}"
+
+class _PushedLines:
+    """
+    Lines handed to one csv.reader a complete record at a time, so a quoted
+    field may span lines while the source stays asynchronous.
+    """
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+async def _csv_records(
+    lines: AsyncIterable[bytes]
+) -> AsyncIterator[Tuple[int, Union[list, str]]]:
+    """
+    Parse CSV lines into (line number, values) pairs, numbering each record by
+    its first line. Lines are buffered until their quotes balance, then read
+    by a single csv.reader. Undecodable lines and malformed records yield
+    (line number, error message) instead.
+    """
+    source = _PushedLines()
+    reader = csv.reader(source)
+    record, record_line, quotes = [], 0, 0
+    line_no = 0
+    async for raw in lines:
+        line_no += 1
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_no, "Invalid UTF-8"
+            record, quotes = [], 0
+            continue
+        if not record:
+            if not line.strip():
+                continue
+            record_line = line_no
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        source.lines.extend(record)
+        record, quotes = [], 0
+        try:
+            yield record_line, next(reader)
+        except csv.Error as e:
+            yield record_line, f"Invalid CSV: {e}"
+    if record:
+        yield record_line, "Invalid CSV: unterminated quoted field"
+
+def _csv_row_to_order(row: dict) -> dict:
+    return {
+        "user_id": row.get("user_id"),
+        "status": row.get("status") or "PENDING",
+        "items": [],
+    }
+
+def _csv_row_to_item(row: dict) -> dict | None:
+    if not row.get("amount"):
+        return None
+    return {
+        "amount": row["amount"],
+        "flavor": row.get("flavor"),
+        "size": row.get("size"),
+        "unit_price_cents": row.get("unit_price_cents"),
+    }
+
+async def parse_import_lines(
+    lines: AsyncIterable[bytes], fmt: str
+) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """
+    Parse NDJSON (one order per line) or CSV (CSV_COLUMNS layout, consecutive rows
+    sharing an order_id form one order) into (line number, order dict) pairs.
+    Rows that fail to decode or validate yield (line number, error message)
+    instead.
+    """
+    if fmt == "csv":
+        header = None
+        group_key, group_line, group = None, 0, None
+        async for line_no, values in _csv_records(lines):
+            if isinstance(values, str):
+                yield line_no, values
+                continue
+            if header is None:
+                header = values
+                continue
+            row = dict(zip(header, values))
+            key = row.get("order_id")
+            if group is None or key != group_key:
+                if group is not None:
+                    yield group_line, _validate_import_row(group)
+                group_key, group_line, group = key, line_no, _csv_row_to_order(row)
+            item = _csv_row_to_item(row)
+            if item is not None:
+                group["items"].append(item)
+        if group is not None:
+            yield group_line, _validate_import_row(group)
+        return
+
+    line_no = 0
+    async for raw in lines:
+        line_no += 1
+        try:
+            line = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_no, "Invalid UTF-8"
+            continue
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, "Invalid JSON: expected an object"
+            continue
+        yield line_no, _validate_import_row(data)
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """
+    Split a byte stream (e.g. a request body) into lines, keeping their line
+    endings so quoted CSV fields spanning lines keep their newlines. Lines are
+    left undecoded so a bad one can be reported on its own.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line + b"\n"
+    if pending:
+        yield pending
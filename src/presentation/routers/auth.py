@@ -1,12 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+
 from src.dependencies import get_auth_use_case, validate_token
-from src.presentation.schemas import SchemaUser, LoginSchema
-from src.domain.use_cases import AuthUseCase
+from src.domain.use_cases import AsyncAuthUseCase
 from src.infrastructure.db.models import User
+from src.infrastructure.security import PasswordHashingBusyError
+from src.presentation.schemas import LoginSchema, SchemaUser
 
 auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _busy(error: PasswordHashingBusyError) -> HTTPException:
+    """
+    Map a saturated hashing pool to 503 so clients back off and retry.
+    """
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": "1"}
+    )
+
 @auth_router.get("/")
 async def home():
     """
@@ -18,13 +30,13 @@ async def home():
 @auth_router.post("/create_account", status_code=status.HTTP_201_CREATED)
 async def create_account(
     schema_user: SchemaUser, 
-    auth_use_case: AuthUseCase = Depends(get_auth_use_case)
+    auth_use_case: AsyncAuthUseCase = Depends(get_auth_use_case)
 ):
     """
     Register a new user account.
     """
     try:
-        auth_use_case.register_user(
+        await auth_use_case.register_user(
             name=schema_user.name,
             email=schema_user.email,
             password=schema_user.password,
@@ -37,16 +49,23 @@ async def create_account(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail=str(e)
         )
+    except PasswordHashingBusyError as e:
+        raise _busy(e)
 
 @auth_router.post("/login")
 async def login(
     login_schema: LoginSchema, 
-    auth_use_case: AuthUseCase = Depends(get_auth_use_case)
+    auth_use_case: AsyncAuthUseCase = Depends(get_auth_use_case)
 ):
     """
     Authenticate a user via JSON payload.
     """
-    user = auth_use_case.authenticate(login_schema.email, login_schema.password)
+    try:
+        user = await auth_use_case.authenticate(
+            login_schema.email, login_schema.password
+        )
+    except PasswordHashingBusyError as e:
+        raise _busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -57,12 +76,15 @@ async def login(
 @auth_router.post("/login-form")
 async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    auth_use_case: AuthUseCase = Depends(get_auth_use_case)
+    auth_use_case: AsyncAuthUseCase = Depends(get_auth_use_case)
 ):
     """
     Authenticate a user via OAuth2 Form (Swagger UI compatible).
     """
-    user = auth_use_case.authenticate(form_data.username, form_data.password)
+    try:
+        user = await auth_use_case.authenticate(form_data.username, form_data.password)
+    except PasswordHashingBusyError as e:
+        raise _busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
@@ -73,7 +95,7 @@ async def login_form(
 @auth_router.get("/refresh")
 async def use_refresh_token(
     user: User = Depends(validate_token),
-    auth_use_case: AuthUseCase = Depends(get_auth_use_case)
+    auth_use_case: AsyncAuthUseCase = Depends(get_auth_use_case)
 ):
     """
     Issue a new access token for an authenticated user.
@@ -1,44 +1,264 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from src.dependencies import get_order_use_case, validate_token
-from src.presentation.schemas import OrderItemSchema, ResponseOrderSchema
-from src.domain.use_cases import OrderUseCase
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.config import settings
+from src.dependencies import (
+    build_order_use_case,
+    get_order_events,
+    get_order_use_case,
+    get_order_writer,
+    get_session_factory,
+    require_admin,
+    validate_stream_token,
+    validate_token,
+)
+from src.domain.use_cases import AsyncOrderUseCase
 from src.infrastructure.db.models import User
+from src.infrastructure.db.write_queue import OrderWriter
+from src.infrastructure.events import OrderEventBus
+from src.presentation.order_io import (
+    encode_orders,
+    event_to_sse,
+    item_to_dict,
+    iter_lines,
+    order_to_dict,
+    parse_import_lines,
+)
+from src.presentation.responses import FastJSONResponse
+from src.presentation.schemas import ChangesSchema, OrderItemSchema, ResponseOrderSchema
+
+# Each route declares its own auth dependency: /events takes ?access_token= as well
+order_router = APIRouter(prefix="/order", tags=["order"])
+
+def _etag(order) -> str:
+    return f'"{order.version}"'
 
-order_router = APIRouter(prefix="/order", tags=["order"], dependencies=[Depends(validate_token)])
+def expected_version(
+    if_match: Optional[str] = Header(None, alias="If-Match")
+) -> Optional[int]:
+    """
+    Order version a mutation is conditional on, from an If-Match ETag.
+    No header or `*` means unconditional.
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip().removeprefix("W/").strip('"')
+    if not tag.isdigit():
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must be an order ETag"
+        )
+    return int(tag)
 
 @order_router.get("/", response_model=List[ResponseOrderSchema])
 async def list_orders(
-    order_use_case: OrderUseCase = Depends(get_order_use_case), 
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = Query(
+        None, description="Value of X-Next-Cursor from the previous page"
+    ),
+    order_status: Optional[str] = Query(None, alias="status"),
+    user_id: Optional[int] = None,
+    order_use_case: AsyncOrderUseCase = Depends(get_order_use_case), 
     user: User = Depends(validate_token)
 ):
     """
-    Retrieve a list of orders.
+    Retrieve a page of orders, newest first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
-    return order_use_case.list_orders(user)
+    try:
+        orders, next_cursor = await order_use_case.list_orders(
+            user, limit=limit, cursor=cursor, status=order_status, user_id=user_id
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else None
+    return FastJSONResponse([order_to_dict(order) for order in orders], headers=headers)
 
 @order_router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_order(
-    order_use_case: OrderUseCase = Depends(get_order_use_case), 
+    writer: OrderWriter = Depends(get_order_writer),
     current_user: User = Depends(validate_token)
 ):
     """
     Initiate a new order.
     """
-    order = order_use_case.create_order(current_user.id)
-    return {"Message": f"Order created successfully {order.id}"}
+    order = await writer.submit(lambda orders: orders.create_order(current_user.id))
+    return FastJSONResponse(
+        {"Message": f"Order created successfully {order.id}"},
+        status_code=status.HTTP_201_CREATED
+    )
+
+@order_router.get("/export")
+async def export_orders(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    start: Optional[date] = Query(
+        None, description="Only orders created on or after this day"
+    ),
+    end: Optional[date] = Query(
+        None, description="Only orders created on or before this day"
+    ),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    user: User = Depends(validate_token)
+):
+    """
+    Stream every order with its items as NDJSON (one order per line) or CSV
+    (one item per row). Admin only.
+    """
+    # The request's session is closed before streaming starts, so use a
+    # dedicated one
+    session = session_factory()
+    try:
+        orders = build_order_use_case(session).export_orders(
+            user, status=order_status, start=start, end=end
+        )
+    except PermissionError as e:
+        await session.close()
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        await session.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def body():
+        try:
+            async for chunk in encode_orders(orders, fmt):
+                yield chunk
+        finally:
+            await session.close()
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="orders.{fmt}"'}
+    )
+
+@order_router.get("/changes", response_model=ChangesSchema)
+async def list_order_changes(
+    since: int = Query(0, ge=0, description="next_since of the previous poll"),
+    limit: int = Query(100, ge=1, le=500),
+    order_use_case: AsyncOrderUseCase = Depends(get_order_use_case),
+    user: User = Depends(validate_token)
+):
+    """
+    Orders created or modified after the `since` change sequence number, and the
+    items deleted since then, for incremental sync.
+    """
+    changes = await order_use_case.list_changes(user, since=since, limit=limit)
+    return FastJSONResponse({
+        "orders": [order_to_dict(order) for order in changes["orders"]],
+        "deleted_items": [
+            {
+                "item_id": tombstone.item_id,
+                "order_id": tombstone.order_id,
+                "change_seq": tombstone.change_seq,
+                "deleted_at": tombstone.deleted_at,
+            }
+            for tombstone in changes["deleted_items"]
+        ],
+        "next_since": changes["next_since"],
+        "has_more": changes["has_more"],
+    })
+
+@order_router.post("/import")
+async def import_orders(
+    request: Request,
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    chunk_size: int = Query(1000, ge=1, le=10000),
+    order_use_case: AsyncOrderUseCase = Depends(get_order_use_case),
+    user: User = Depends(require_admin)
+):
+    """
+    Bulk import orders from an NDJSON or CSV request body (same layouts as
+    /order/export). Rows are validated and written in chunks; invalid rows are
+    reported per line.
+    """
+    rows = parse_import_lines(iter_lines(request.stream()), fmt)
+    return await order_use_case.import_orders(rows, chunk_size=chunk_size)
+
+@order_router.get("/events")
+async def order_events_stream(
+    request: Request,
+    last_event_id: Optional[int] = Query(None),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    events: OrderEventBus = Depends(get_order_events),
+    user: User = Depends(validate_stream_token)
+):
+    """
+    Stream order changes as Server-Sent Events. Admins receive every order,
+    other users only their own. Reconnect with Last-Event-ID to resume; a
+    `reset` event means the gap could not be replayed and state should be
+    refetched. EventSource clients pass their token as ?access_token=.
+    """
+    user_id, admin = user.id, user.admin
+    resume_from = last_event_id_header
+    if resume_from is None:
+        resume_from = last_event_id
+    subscription = events.subscribe(
+        lambda event: admin or event.user_id == user_id,
+        last_event_id=resume_from
+    )
+    # Events published from here on are queued, so the reset points just before them
+    reset_id = events.last_event_id
+
+    async def body():
+        try:
+            if subscription.missed_events:
+                yield f"id: {reset_id}\nevent: reset\ndata: {{}}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.get(
+                        timeout=settings.SSE_HEARTBEAT_SECONDS
+                    )
+                except ConnectionAbortedError:
+                    # Too slow to keep up; the client reconnects with its last id
+                    return
+                yield ": keep-alive\n\n" if event is None else event_to_sse(event)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @order_router.get("/{order_id}", response_model=ResponseOrderSchema)
 async def get_order_by_id(
     order_id: int,
-    order_use_case: OrderUseCase = Depends(get_order_use_case),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    order_use_case: AsyncOrderUseCase = Depends(get_order_use_case),
     user: User = Depends(validate_token)
 ):
     """
     Retrieve detailed information about a specific order.
+    The ETag is the order's version; send it back as If-Match to make a
+    change conditional, or as If-None-Match to skip an unchanged body.
     """
     try:
-        return order_use_case.get_order(order_id, user)
+        order = await order_use_case.get_order(order_id, user)
+        etag = _etag(order)
+        if if_none_match is not None and etag in [
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        ]:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+            )
+        return FastJSONResponse(order_to_dict(order), headers={"ETag": etag})
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
@@ -47,18 +267,21 @@ async def get_order_by_id(
 @order_router.post("/{order_id}/cancel")
 async def cancel_order(
     order_id: int, 
-    order_use_case: OrderUseCase = Depends(get_order_use_case), 
+    version: Optional[int] = Depends(expected_version),
+    writer: OrderWriter = Depends(get_order_writer),
     user: User = Depends(validate_token)
 ):
     """
     Cancel an existing order.
     """
     try:
-        order = order_use_case.cancel_order(order_id, user)
-        return {
+        order = await writer.submit(lambda orders: orders.cancel_order(
+            order_id, user, expected_version=version
+        ))
+        return FastJSONResponse({
             "message": f"Order nº {order.id} was successfully cancelled.",
-            "order": ResponseOrderSchema.model_validate(order).model_dump()
-        }
+            "order": order_to_dict(order)
+        }, headers={"ETag": _etag(order)})
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
@@ -68,61 +291,105 @@ async def cancel_order(
 async def add_order_item(
     order_id: int, 
     order_item_schema: OrderItemSchema, 
-    order_use_case: OrderUseCase = Depends(get_order_use_case), 
+    version: Optional[int] = Depends(expected_version),
+    writer: OrderWriter = Depends(get_order_writer),
     user: User = Depends(validate_token)
 ):
     """
     Add a new item to a specific order.
     """
     try:
-        order = order_use_case.add_item(
+        order = await writer.submit(lambda orders: orders.add_item(
             order_id=order_id,
             amount=order_item_schema.amount,
             flavor=order_item_schema.flavor,
             size=order_item_schema.size,
-            unit_price=order_item_schema.unit_price,
-            user=user
-        )
-        return {
+            unit_price_cents=order_item_schema.unit_price_cents,
+            user=user,
+            expected_version=version
+        ))
+        return FastJSONResponse({
             "message": "Item added successfully",
-            "order": ResponseOrderSchema.model_validate(order).model_dump()
-        }
+            "order": order_to_dict(order)
+        }, status_code=status.HTTP_201_CREATED, headers={"ETag": _etag(order)})
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@order_router.post("/{order_id}/items/batch", status_code=status.HTTP_201_CREATED)
+async def add_order_items(
+    order_id: int,
+    order_items: List[OrderItemSchema] = Body(..., min_length=1, max_length=100),
+    version: Optional[int] = Depends(expected_version),
+    writer: OrderWriter = Depends(get_order_writer),
+    user: User = Depends(validate_token)
+):
+    """
+    Add several items to a specific order in a single request and transaction.
+    """
+    fields = {"amount", "flavor", "size", "unit_price_cents"}
+    items = [item.model_dump(include=fields) for item in order_items]
+    try:
+        order = await writer.submit(lambda orders: orders.add_items(
+            order_id=order_id, items=items, user=user, expected_version=version
+        ))
+        return FastJSONResponse({
+            "message": f"{len(order_items)} items added successfully",
+            "order": order_to_dict(order)
+        }, status_code=status.HTTP_201_CREATED, headers={"ETag": _etag(order)})
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @order_router.delete("/items/{item_id}")
 async def delete_order_item(
     item_id: int, 
-    order_use_case: OrderUseCase = Depends(get_order_use_case),
+    version: Optional[int] = Depends(expected_version),
+    writer: OrderWriter = Depends(get_order_writer),
     user: User = Depends(validate_token)
 ):
     """
     Remove a specific item from an order.
     """
     try:
-        order = order_use_case.delete_item(item_id, user)
-        return {
+        order = await writer.submit(lambda orders: orders.delete_item(
+            item_id, user, expected_version=version
+        ))
+        return FastJSONResponse({
             "message": "Item deleted successfully",
-            "order": ResponseOrderSchema.model_validate(order).model_dump()
-        }
+            "order": order_to_dict(order)
+        }, headers={"ETag": _etag(order)})
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
         raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @order_router.post("/{order_id}/finish", response_model=List[OrderItemSchema])
 async def finalise_order(
     order_id: int,
-    order_use_case: OrderUseCase = Depends(get_order_use_case),
+    version: Optional[int] = Depends(expected_version),
+    writer: OrderWriter = Depends(get_order_writer),
     user: User = Depends(validate_token)
 ):
     """
     Finalize an order.
     """
     try:
-        return order_use_case.finalize_order(order_id, user)
+        order = await writer.submit(lambda orders: orders.finalize_order(
+            order_id, user, expected_version=version
+        ))
+        return FastJSONResponse(
+            [item_to_dict(item) for item in order.items],
+            headers={"ETag": _etag(order)}
+        )
     except LookupError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except PermissionError as e:
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.dependencies import get_report_use_case, require_admin
+from src.domain.clock import business_today
+from src.domain.use_cases import ReportUseCase
+
+report_router = APIRouter(
+    prefix="/reports", tags=["reports"], dependencies=[Depends(require_admin)]
+)
+
+def date_range(
+    start: Optional[date] = Query(
+        None, description="First day (inclusive), defaults to 30 days ago"
+    ),
+    end: Optional[date] = Query(
+        None,
+        description="Last day (inclusive), defaults to today in BUSINESS_TIMEZONE"
+    )
+) -> tuple[date, date]:
+    end = end or business_today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return start, end
+
+@report_router.get("/revenue")
+async def revenue(
+    period: tuple[date, date] = Depends(date_range),
+    report_use_case: ReportUseCase = Depends(get_report_use_case)
+):
+    """
+    Revenue and number of finished orders per day.
+    """
+    return await report_use_case.revenue(*period)
+
+@report_router.get("/top-flavors")
+async def top_flavors(
+    limit: int = Query(10, ge=1, le=100),
+    period: tuple[date, date] = Depends(date_range),
+    report_use_case: ReportUseCase = Depends(get_report_use_case)
+):
+    """
+    Best selling flavors by revenue.
+    """
+    return await report_use_case.top_flavors(*period, limit=limit)
+
+@report_router.get("/sizes")
+async def sizes(
+    period: tuple[date, date] = Depends(date_range),
+    report_use_case: ReportUseCase = Depends(get_report_use_case)
+):
+    """
+    Quantity and revenue per pizza size.
+    """
+    return await report_use_case.sizes(*period)
+
+@report_router.get("/statuses")
+async def statuses(
+    period: tuple[date, date] = Depends(date_range),
+    report_use_case: ReportUseCase = Depends(get_report_use_case)
+):
+    """
+    Closed orders and their value per final status.
+    """
+    return await report_use_case.statuses(*period)
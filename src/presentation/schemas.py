@@ -1,5 +1,13 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+
+from src.domain.money import MAX_CENTS, from_cents, line_total_cents, to_cents
+
+# Largest quantity accepted on a single order line
+MAX_ITEM_AMOUNT = 1000
+
 
 class SchemaUser(BaseModel):
     name: str
@@ -23,17 +31,96 @@ class LoginSchema(BaseModel):
 
 class OrderItemSchema(BaseModel):
     id: Optional[int] = None
-    amount: int
+    amount: int = Field(ge=1, le=MAX_ITEM_AMOUNT)
     flavor: str
     size: str
-    unit_price: float
+    unit_price_cents: int = Field(ge=-MAX_CENTS, le=MAX_CENTS)
     
     model_config = ConfigDict(from_attributes=True)
 
+    @model_validator(mode="before")
+    @classmethod
+    def accept_decimal_unit_price(cls, data: Any) -> Any:
+        """
+        Accept the legacy decimal `unit_price` field and convert it to cents.
+        A value that is not a finite amount (null, "abc", Infinity) raises
+        ValueError, which pydantic reports as a validation error.
+        """
+        legacy = isinstance(data, dict) and "unit_price" in data
+        if legacy and "unit_price_cents" not in data:
+            data = {**data, "unit_price_cents": to_cents(data["unit_price"])}
+        return data
+
+    @model_validator(mode="after")
+    def check_line_total(self) -> "OrderItemSchema":
+        line_total_cents(self.amount, self.unit_price_cents)
+        return self
+
+    @computed_field
+    @property
+    def unit_price(self) -> float:
+        return from_cents(self.unit_price_cents)
+
 class ResponseOrderSchema(BaseModel):
     id: int
     status: str
-    price: float
+    price_cents: int
+    created_at: datetime
+    updated_at: datetime
+    change_seq: int
+    version: int
     items: List[OrderItemSchema]
 
     model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def price(self) -> float:
+        return from_cents(self.price_cents)
+
+class DeletedItemSchema(BaseModel):
+    item_id: int
+    order_id: int
+    change_seq: int
+    deleted_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ChangesSchema(BaseModel):
+    orders: List[ResponseOrderSchema]
+    deleted_items: List[DeletedItemSchema]
+    next_since: int
+    has_more: bool
+
+
+class ImportOrderSchema(BaseModel):
+    """
+    One order of a bulk import (legacy POS / offline tablets).
+    """
+    user_id: int
+    status: Literal["PENDING", "CANCELED", "FINISHED"] = "PENDING"
+    items: List[OrderItemSchema] = []
+
+    @model_validator(mode="after")
+    def check_order_total(self) -> "ImportOrderSchema":
+        # Imported totals are summed in SQL, where SQLite silently turns an
+        # INTEGER overflow into REAL
+        total = sum(
+            line_total_cents(item.amount, item.unit_price_cents)
+            for item in self.items
+        )
+        if abs(total) > MAX_CENTS:
+            raise ValueError(f"Order total out of range: {total} cents")
+        return self
+
+    def to_import_row(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "status": self.status,
+            "items": [
+                item.model_dump(
+                    include={"amount", "flavor", "size", "unit_price_cents"}
+                )
+                for item in self.items
+            ],
+        }
@@ -1,22 +1,46 @@
+import os
+import tempfile
+
 import pytest
+
+# Cheap bcrypt cost keeps the suite fast; must be set before settings are loaded
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from src.infrastructure.db.database import Base
-from src.dependencies import get_session
+from sqlalchemy.pool import NullPool
+
+from src.dependencies import get_session_factory
+from src.infrastructure.cache import user_cache
+from src.infrastructure.db.database import Base, configure_sqlite_engine
+from src.infrastructure.profiling import instrument_engine
+from src.infrastructure.security import token_cache
 from src.main import app
 
-# Create an in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite://"
+# Use a temporary SQLite file so the sync fixtures and the async app share one database
+_db_dir = tempfile.mkdtemp()
+_db_path = os.path.join(_db_dir, "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{_db_path}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{_db_path}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
 )
+configure_sqlite_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: connections never outlive the event loop that opened them
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+configure_sqlite_engine(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 @pytest.fixture(scope="function", autouse=True)
 def setup_database():
     # Create tables before each test
@@ -24,29 +48,53 @@ def setup_database():
     yield
     # Drop tables after each test
     Base.metadata.drop_all(bind=engine)
+    # Ids are reused across tests, so cached users and tokens must not leak between them
+    user_cache.clear()
+    token_cache.clear()
 
 @pytest.fixture(scope="function")
 def db_session():
-    connection = engine.connect()
-    transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal()
     
     yield session
     
     session.close()
-    transaction.rollback()
-    connection.close()
 
 @pytest.fixture(scope="function")
-def client(db_session):
-    # Override get_session dependency to use the test session
-    def override_get_session():
-        try:
-            yield db_session
-        finally:
-            pass
-            
-    app.dependency_overrides[get_session] = override_get_session
+def client():
+    # Override the session factory so every session uses the test database
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
+
+class QueryCounter:
+    """
+    Collects the SQL statements and COMMITs executed by the app's async engine.
+    """
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def on_commit(self, conn):
+        self.commits += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+        self.commits = 0
+
+@pytest.fixture(scope="function")
+def query_counter():
+    counter = QueryCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    event.listen(async_engine.sync_engine, "commit", counter.on_commit)
+    yield counter
+    event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+    event.remove(async_engine.sync_engine, "commit", counter.on_commit)
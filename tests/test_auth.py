@@ -94,3 +94,82 @@ def test_refresh_token(client):
     response = client.get("/auth/refresh", headers=headers)
     assert response.status_code == status.HTTP_200_OK
     assert "access_token" in response.json()
+
+def test_login_rejected_when_hashing_pool_saturated(client, monkeypatch):
+    client.post("/auth/create_account", json={
+        "name": "Test User",
+        "email": "test@example.com",
+        "password": "testpassword"
+    })
+    monkeypatch.setattr("src.infrastructure.security.settings.BCRYPT_MAX_PENDING", 0)
+
+    response = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "testpassword"
+    })
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
+
+def test_validate_token_serves_user_from_cache(client, query_counter, db_session):
+    from src.infrastructure.cache import user_cache
+    from src.infrastructure.db.models import User
+
+    client.post("/auth/create_account", json={
+        "name": "Test User",
+        "email": "test@example.com",
+        "password": "testpassword"
+    })
+    login_res = client.post("/auth/login", json={
+        "email": "test@example.com",
+        "password": "testpassword"
+    })
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+
+    client.get("/auth/refresh", headers=headers)
+    query_counter.reset()
+    response = client.get("/auth/refresh", headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert query_counter.count == 0
+    assert user_cache.hits >= 1
+
+    # Modifying the user through the ORM evicts the cached copy once committed
+    user = db_session.query(User).filter(User.email == "test@example.com").one()
+    user_id = user.id
+    user.name = "Renamed"
+    db_session.flush()
+    assert user_cache.get(user_id) is not None
+    db_session.commit()
+    assert user_cache.get(user_id) is None
+
+    # A change that is rolled back leaves the cached copy alone
+    client.get("/auth/refresh", headers=headers)
+    user.name = "Discarded"
+    db_session.flush()
+    db_session.rollback()
+    assert user_cache.get(user_id).name == "Renamed"
+
+def test_decode_access_token_caches_verified_tokens(monkeypatch):
+    from datetime import timedelta
+
+    import jwt
+
+    from src.infrastructure import security
+
+    calls = []
+    real_decode = jwt.decode
+    def counting_decode(*args, **kwargs):
+        calls.append(1)
+        return real_decode(*args, **kwargs)
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+
+    token = security.create_access_token(42)
+    assert security.decode_access_token(token) == 42
+    assert security.decode_access_token(token) == 42
+    assert len(calls) == 1
+    assert security.token_cache.hits == 1
+
+    # A token that is already expired is never cached
+    expired = security.create_access_token(42, expires_delta=timedelta(seconds=-1))
+    assert security.decode_access_token(expired) is None
+    assert security.decode_access_token("not-a-token") is None
+    assert len(security.token_cache) == 1
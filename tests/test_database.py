@@ -0,0 +1,242 @@
+import asyncio
+
+from src.config import settings
+from src.infrastructure.db.database import SQLITE_PRAGMAS
+from tests.conftest import async_engine
+
+
+def test_sqlite_pragma_profile_applied_to_async_connections():
+    async def read():
+        async with async_engine.connect() as connection:
+            return {
+                pragma: (await connection.exec_driver_sql(f"PRAGMA {pragma}")).scalar()
+                for pragma in SQLITE_PRAGMAS
+            }
+
+    pragmas = asyncio.run(read())
+    assert pragmas["journal_mode"].upper() == settings.SQLITE_JOURNAL_MODE.upper()
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["cache_size"] == settings.SQLITE_CACHE_SIZE
+    assert pragmas["busy_timeout"] == settings.SQLITE_BUSY_TIMEOUT_MS
+    assert pragmas["temp_store"] == 2  # MEMORY
+
+def test_request_profile_in_server_timing_and_slow_log(client, monkeypatch, caplog):
+    from tests.test_orders import _create_and_login_user
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/order/", headers=headers)
+
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0)
+    with caplog.at_level("WARNING", logger="uvicorn.error"):
+        res = client.get("/order/1", headers=headers)
+
+    timing = res.headers["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    # The order is read with its items in one statement; the user comes from
+    # the cache
+    assert 'desc="1 queries"' in timing
+    assert "app;dur=" in timing
+    messages = [record.getMessage() for record in caplog.records]
+    slow = [message for message in messages if "Slow request GET /order/1" in message]
+    assert len(slow) == 1
+    assert "1 statements" in slow[0]
+    assert "JOIN order_item" in slow[0]
+
+def test_busy_errors_are_told_apart_from_real_failures():
+    import sqlite3
+
+    from sqlalchemy.exc import OperationalError
+
+    from src.infrastructure.db.retry import is_busy_error
+
+    def error(message, code=None):
+        orig = sqlite3.OperationalError(message)
+        if code is not None:
+            orig.sqlite_errorcode = code
+        return OperationalError("statement", {}, orig)
+
+    assert is_busy_error(error("database is locked", 5))
+    assert is_busy_error(error("database is locked", 517))  # SQLITE_BUSY_SNAPSHOT
+    assert is_busy_error(error("database table is locked", 6))
+    assert is_busy_error(error("database is locked"))
+    assert not is_busy_error(error("no such table: orders", 1))
+    assert not is_busy_error(ValueError("database is locked"))
+
+def test_busy_retry_policy_retries_until_deadline():
+    import sqlite3
+
+    from src.infrastructure.db.retry import BusyRetryPolicy
+    from src.infrastructure.metrics import (
+        db_busy_failures_total,
+        db_busy_retries_total,
+        db_transaction_attempts,
+    )
+
+    policy = BusyRetryPolicy(base_delay=0.001, max_delay=0.002, deadline=0.5)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "done"
+
+    async def locked():
+        raise sqlite3.OperationalError("database is locked")
+
+    async def broken():
+        calls.append(1)
+        raise sqlite3.OperationalError("no such table: orders")
+
+    retries = db_busy_retries_total.value("test")
+    attempts = db_transaction_attempts.count("test")
+    assert asyncio.run(policy.run("test", flaky)) == "done"
+    assert len(calls) == 3
+    assert db_busy_retries_total.value("test") == retries + 2
+
+    calls.clear()
+    try:
+        asyncio.run(policy.run("test", broken))
+    except sqlite3.OperationalError:
+        pass
+    assert len(calls) == 1
+
+    failures = db_busy_failures_total.value("test")
+    try:
+        policy = BusyRetryPolicy(base_delay=0.001, max_delay=0.002, deadline=0.02)
+        asyncio.run(policy.run("test", locked))
+    except sqlite3.OperationalError:
+        pass
+    assert db_busy_failures_total.value("test") == failures + 1
+    assert db_transaction_attempts.count("test") == attempts + 3
+
+def test_writer_retries_while_another_connection_holds_the_lock(db_session):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from src.dependencies import build_order_use_case
+    from src.infrastructure.db.models import Order, User
+    from src.infrastructure.db.retry import BusyRetryPolicy
+    from src.infrastructure.db.write_queue import DirectWriter
+    from src.infrastructure.events import OrderEventBus
+    from src.infrastructure.metrics import db_busy_retries_total
+    from tests.conftest import ASYNC_SQLALCHEMY_DATABASE_URL, engine
+
+    user = User(name="Writer", email="writer@example.com", password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+
+    # No busy timeout: a locked database fails immediately and only the policy waits
+    impatient = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"timeout": 0}
+    )
+    writer = DirectWriter(
+        async_sessionmaker(bind=impatient, autoflush=False, expire_on_commit=False),
+        build_order_use_case,
+        OrderEventBus(history_size=10, queue_size=10),
+        retry=BusyRetryPolicy(base_delay=0.01, max_delay=0.02, deadline=5)
+    )
+    retries = db_busy_retries_total.value("order_write")
+    blocker = engine.connect()
+    blocker.exec_driver_sql("BEGIN IMMEDIATE")
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.1, blocker.commit)
+        try:
+            return await writer.submit(lambda orders: orders.create_order(user_id))
+        finally:
+            await impatient.dispose()
+
+    try:
+        order = asyncio.run(run())
+    finally:
+        blocker.close()
+    assert db_session.get(Order, order.id) is not None
+    assert db_busy_retries_total.value("order_write") > retries
+
+def test_lock_waits_inside_busy_timeout_are_measured(db_session):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from src.dependencies import build_order_use_case
+    from src.domain.use_cases import AsyncAuthUseCase
+    from src.infrastructure.db.models import User
+    from src.infrastructure.db.repositories import AsyncSQLAlchemyUserRepository
+    from src.infrastructure.db.retry import BusyRetryPolicy
+    from src.infrastructure.db.unit_of_work import AsyncSQLAlchemyUnitOfWork
+    from src.infrastructure.db.write_queue import DirectWriter
+    from src.infrastructure.events import OrderEventBus
+    from src.infrastructure.metrics import (
+        db_busy_retries_total,
+        db_lock_wait_seconds,
+        db_transaction_seconds,
+    )
+    from tests.conftest import (
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        TestingAsyncSessionLocal,
+        engine,
+    )
+
+    user = User(name="Writer", email="writer@example.com", password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+
+    # busy_timeout absorbs the wait: no retry, yet the transaction took the time
+    writer = DirectWriter(
+        TestingAsyncSessionLocal,
+        build_order_use_case,
+        OrderEventBus(history_size=10, queue_size=10),
+        retry=BusyRetryPolicy(base_delay=0.01, max_delay=0.02, deadline=5)
+    )
+    lock_wait = db_lock_wait_seconds.sum("order_write")
+    duration = db_transaction_seconds.sum("order_write")
+    blocker = engine.connect()
+    blocker.exec_driver_sql("BEGIN IMMEDIATE")
+
+    async def write():
+        asyncio.get_running_loop().call_later(0.1, blocker.commit)
+        return await writer.submit(lambda orders: orders.create_order(user_id))
+
+    try:
+        asyncio.run(write())
+    finally:
+        blocker.close()
+    assert db_lock_wait_seconds.sum("order_write") - lock_wait < 0.01
+    assert db_transaction_seconds.sum("order_write") - duration >= 0.1
+
+    # Registration goes through the retry policy too
+    impatient = create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"timeout": 0}
+    )
+    retries = db_busy_retries_total.value("register_user")
+    blocker = engine.connect()
+    blocker.exec_driver_sql("BEGIN IMMEDIATE")
+
+    async def register():
+        asyncio.get_running_loop().call_later(0.1, blocker.commit)
+        try:
+            factory = async_sessionmaker(bind=impatient, expire_on_commit=False)
+            async with factory() as session:
+                use_case = AsyncAuthUseCase(
+                    AsyncSQLAlchemyUserRepository(session),
+                    AsyncSQLAlchemyUnitOfWork(session)
+                )
+                return await use_case.register_user(
+                    "Patient", "patient@example.com", "password"
+                )
+        finally:
+            await impatient.dispose()
+
+    try:
+        registered = asyncio.run(register())
+    finally:
+        blocker.close()
+    assert db_session.get(User, registered.id) is not None
+    assert db_busy_retries_total.value("register_user") > retries
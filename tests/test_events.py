@@ -0,0 +1,187 @@
+import asyncio
+
+from fastapi import status
+
+from src.config import settings
+from src.dependencies import get_order_events
+from src.infrastructure.db.models import Order
+from src.infrastructure.events import OrderEventBus, order_events
+from src.main import app
+from src.presentation.order_io import event_to_sse
+from tests.test_orders import _create_and_login_user
+
+
+def _order(order_id, user_id):
+    order = Order(user_id=user_id)
+    order.id = order_id
+    return order
+
+async def _read_stream(path, query, headers, frames, on_open=lambda: None):
+    """
+    GET an SSE route over raw ASGI, call `on_open` once the response has
+    started, and disconnect after `frames` frames. Returns (status, frames).
+    """
+    disconnected = asyncio.Event()
+    requested = False
+    start, received, buffer = {}, [], ""
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal buffer
+        if message["type"] == "http.response.start":
+            start.update(message)
+            on_open()
+        elif message["type"] == "http.response.body":
+            buffer += message.get("body", b"").decode()
+            *complete, buffer = buffer.split("\n\n")
+            received.extend(complete)
+            if len(received) >= frames or not message.get("more_body"):
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+    return start["status"], received
+
+def test_event_bus_filters_and_resumes():
+    async def run():
+        bus = OrderEventBus(history_size=3, queue_size=10)
+        own = bus.subscribe(lambda event: event.user_id == 1)
+        bus.publish("created", _order(1, 1))
+        bus.publish("created", _order(2, 2))
+        first = await own.get(timeout=0.1)
+        nothing = await own.get(timeout=0.01)
+        own.close()
+
+        for order_id in range(3, 6):
+            bus.publish("created", _order(order_id, 1))
+        # Event 3 is still in the history, event 1 has been evicted
+        resumed = bus.subscribe(last_event_id=3)
+        replayed = [(await resumed.get(timeout=0.1)).id for _ in range(2)]
+        stale = bus.subscribe(last_event_id=1)
+        return first, nothing, replayed, resumed.missed_events, stale.missed_events
+
+    first, nothing, replayed, resumed_missed, stale_missed = asyncio.run(run())
+    assert (first.type, first.order_id) == ("created", 1)
+    assert nothing is None
+    assert replayed == [4, 5]
+    assert resumed_missed is False
+    assert stale_missed is True
+
+def test_event_bus_drops_lagging_subscriber():
+    async def run():
+        bus = OrderEventBus(history_size=10, queue_size=2)
+        slow = bus.subscribe()
+        for order_id in range(1, 4):
+            bus.publish("created", _order(order_id, 1))
+        buffered = [(await slow.get()).id for _ in range(2)]
+        try:
+            await slow.get(timeout=0.1)
+        except ConnectionAbortedError:
+            return buffered, True
+        return buffered, False
+
+    buffered, aborted = asyncio.run(run())
+    assert buffered == [1, 2]
+    assert aborted is True
+
+def test_order_changes_are_published(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    start = order_events.last_event_id
+
+    create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    item = {
+        "amount": 2, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4500
+    }
+    add_res = client.post(f"/order/{order_id}/items", json=item, headers=headers)
+    item_id = add_res.json()["order"]["items"][0]["id"]
+    client.post(f"/order/{order_id}/items/batch", json=[item], headers=headers)
+    client.delete(f"/order/items/{item_id}", headers=headers)
+    finish_res = client.post(f"/order/{order_id}/finish", headers=headers)
+    assert finish_res.status_code == status.HTTP_200_OK
+    client.post(f"/order/{order_id}/cancel", headers=headers)
+
+    async def drain():
+        subscription = order_events.subscribe(last_event_id=start)
+        events = []
+        while (event := await subscription.get(timeout=0.01)) is not None:
+            events.append(event)
+        subscription.close()
+        return events
+
+    events = asyncio.run(drain())
+    assert [event.type for event in events] == [
+        "created", "item_added", "item_added", "item_deleted", "finished", "canceled"
+    ]
+    assert all(event.order_id == order_id for event in events)
+    assert events[1].data["item_ids"] == [item_id]
+    assert events[3].data == {
+        "status": "PENDING", "price_cents": 4500 * 2, "item_ids": [item_id]
+    }
+    assert events[-1].data["status"] == "CANCELED"
+
+    frame = event_to_sse(events[0])
+    assert frame.startswith(f"id: {events[0].id}\nevent: created\ndata: ")
+    assert frame.endswith("\n\n")
+
+def test_events_route_filters_resets_and_heartbeats(client, monkeypatch):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    bus = OrderEventBus(history_size=2, queue_size=10)
+    app.dependency_overrides[get_order_events] = lambda: bus
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_SECONDS", 0.05)
+    for order_id in range(1, 4):
+        bus.publish("created", _order(order_id, 1))
+
+    def publish_two():
+        bus.publish("created", _order(4, 2))
+        bus.publish("created", _order(5, 1))
+
+    async def run():
+        # EventSource style: token in the query string, stale Last-Event-ID
+        own = await _read_stream(
+            "/order/events", f"access_token={token}",
+            {"Last-Event-ID": "0"}, frames=3, on_open=publish_two
+        )
+        # Admins see every order; event 3 is still in the history
+        admin = await _read_stream(
+            "/order/events", "last_event_id=3",
+            {"Authorization": f"Bearer {admin_token}"}, frames=2
+        )
+        anonymous = await _read_stream("/order/events", "", {}, frames=1)
+        return own, admin, anonymous
+
+    own, admin, anonymous = asyncio.run(run())
+    own_status, own_frames = own
+    assert own_status == status.HTTP_200_OK
+    assert own_frames[0] == "id: 3\nevent: reset\ndata: {}"
+    # Event 4 belongs to another user
+    assert own_frames[1].startswith("id: 5\nevent: created\n")
+    assert own_frames[2] == ": keep-alive"
+    admin_status, admin_frames = admin
+    assert admin_status == status.HTTP_200_OK
+    assert [frame.split("\n")[0] for frame in admin_frames] == ["id: 4", "id: 5"]
+    assert anonymous[0] == status.HTTP_401_UNAUTHORIZED
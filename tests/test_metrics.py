@@ -0,0 +1,88 @@
+from fastapi import status
+
+from src.config import settings
+from src.infrastructure.metrics import (
+    Registry,
+    http_request_duration_seconds,
+    http_requests_total,
+)
+from tests.test_orders import _create_and_login_user
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/a\\"b"} 3' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_count 3" in lines
+
+def test_metrics_endpoint_reports_routes_bcrypt_and_caches(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    # The registry is process wide, so compare against the values before the calls
+    detail_before = http_requests_total.value("GET", "/order/{order_id}", "200")
+    unmatched_before = http_requests_total.value("GET", "unmatched", "404")
+    create_before = http_request_duration_seconds.count("POST", "/order/")
+    client.post("/order/", headers=headers)
+    client.get("/order/1", headers=headers)
+    client.get("/order/1", headers=headers)
+    client.get("/no-such-path")
+
+    # Paths are reported by route template, not by the concrete id
+    detail_after = http_requests_total.value("GET", "/order/{order_id}", "200")
+    assert detail_after == detail_before + 2
+    assert http_requests_total.value("GET", "unmatched", "404") == unmatched_before + 1
+    assert http_request_duration_seconds.count("POST", "/order/") == create_before + 1
+
+    res = client.get("/metrics")
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+    assert (
+        'http_requests_total{method="GET",route="/order/{order_id}",status="200"}'
+        in body
+    )
+    assert 'password_hash_duration_seconds_count{operation="verify"}' in body
+    assert 'cache_hits_total{cache="user"}' in body
+    assert 'cache_hit_ratio{cache="token"}' in body
+    assert 'db_pool_connections{state="checked_out"}' in body
+
+def test_streamed_responses_are_counted_but_not_timed(client, monkeypatch, caplog):
+    token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 1000
+    }
+    client.post("/order/", headers=headers)
+    client.post("/order/1/items", json=item, headers=headers)
+    requests_before = http_requests_total.value("GET", "/order/export", "200")
+    timed_before = http_request_duration_seconds.count("GET", "/order/export")
+
+    monkeypatch.setattr(settings, "SLOW_REQUEST_THRESHOLD_MS", 0)
+    with caplog.at_level("WARNING", logger="uvicorn.error"):
+        res = client.get("/order/export", headers=headers)
+        client.get("/order/1", headers=headers)
+
+    assert res.status_code == status.HTTP_200_OK
+    assert res.text
+    assert http_requests_total.value("GET", "/order/export", "200") == (
+        requests_before + 1
+    )
+    # A stream lasts as long as the client reads it, so it is no latency sample
+    assert http_request_duration_seconds.count("GET", "/order/export") == timed_before
+    messages = [record.getMessage() for record in caplog.records]
+    assert not any("Slow request GET /order/export" in m for m in messages)
+    assert any("Slow request GET /order/1" in m for m in messages)
@@ -125,3 +125,571 @@ def test_delete_order_item(client):
     assert del_res.status_code == status.HTTP_200_OK
     assert del_res.json()["order"]["price"] == 0.0
     assert len(del_res.json()["order"]["items"]) == 0
+
+def test_list_orders_keyset_pagination(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(5):
+        client.post("/order/", headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        res = client.get("/order/", params=params, headers=headers)
+        assert res.status_code == status.HTTP_200_OK
+        assert len(res.json()) <= 2
+        seen.extend(order["id"] for order in res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == 5
+
+def test_list_orders_filters(client):
+    token1 = _create_and_login_user(client, "user1@example.com", "password")
+    token2 = _create_and_login_user(client, "user2@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers1 = {"Authorization": f"Bearer {token1}"}
+
+    create_res = client.post("/order/", headers=headers1)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    client.post("/order/", headers=headers1)
+    client.post(f"/order/{order_id}/cancel", headers=headers1)
+    client.post("/order/", headers={"Authorization": f"Bearer {token2}"})
+
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client.get("/order/", params={"status": "CANCELED"}, headers=admin_headers)
+    assert [order["id"] for order in res.json()] == [order_id]
+
+    res = client.get("/order/", params={"user_id": 1}, headers=admin_headers)
+    assert len(res.json()) == 2
+
+    # Non-admins cannot list somebody else's orders
+    res = client.get("/order/", params={"user_id": 2}, headers=headers1)
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+def test_list_orders_query_count_independent_of_order_count(
+    client,
+    query_counter
+):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    item_payload = {
+        "amount": 1, "flavor": "Mussarela", "size": "Media", "unit_price": 35.0
+    }
+
+    def create_order_with_items():
+        create_res = client.post("/order/", headers=headers)
+        order_id = int(create_res.json()["Message"].split()[-1])
+        for _ in range(2):
+            client.post(f"/order/{order_id}/items", json=item_payload, headers=headers)
+
+    create_order_with_items()
+    query_counter.reset()
+    client.get("/order/", headers=headers)
+    single_order_queries = query_counter.count
+
+    for _ in range(4):
+        create_order_with_items()
+    query_counter.reset()
+    res = client.get("/order/", headers=headers)
+    assert len(res.json()) == 5
+    assert all(len(order["items"]) == 2 for order in res.json())
+    assert query_counter.count == single_order_queries
+
+def test_add_item_accepts_integer_cents(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+
+    client.post(f"/order/{order_id}/items", json={
+        "amount": 3, "flavor": "Portuguesa", "size": "Pequena", "unit_price": 29.9
+    }, headers=headers)
+    add_res = client.post(f"/order/{order_id}/items", json={
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990
+    }, headers=headers)
+
+    order = add_res.json()["order"]
+    assert [item["unit_price_cents"] for item in order["items"]] == [2990, 4990]
+    assert order["price_cents"] == 3 * 2990 + 4990
+    assert order["price"] == 139.6
+
+def test_add_item_rejects_invalid_decimal_price(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/order/", headers=headers)
+
+    json_headers = {**headers, "Content-Type": "application/json"}
+    for unit_price in ["null", '"abc"', "Infinity", "1e30"]:
+        body = (
+            '{"amount": 1, "flavor": "Calabresa", "size": "Grande", '
+            f'"unit_price": {unit_price}}}'
+        )
+        res = client.post("/order/1/items", content=body, headers=json_headers)
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, unit_price
+    assert client.get("/order/1", headers=headers).json()["items"] == []
+
+def test_add_item_rejects_out_of_range_totals(client):
+    from src.domain.money import MAX_CENTS
+
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/order/", headers=headers)
+
+    item = {"flavor": "Calabresa", "size": "Grande"}
+    for amount, unit_price_cents in [(0, 4990), (100000, 2**62), (1000, 2**62)]:
+        res = client.post("/order/1/items", json={
+            **item, "amount": amount, "unit_price_cents": unit_price_cents
+        }, headers=headers)
+        assert res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY, amount
+
+    # Each line fits, but the running total would not
+    res = client.post("/order/1/items", json={
+        **item, "amount": 1, "unit_price_cents": MAX_CENTS - 10
+    }, headers=headers)
+    assert res.status_code == status.HTTP_201_CREATED
+    res = client.post("/order/1/items/batch", json=[
+        {**item, "amount": 1, "unit_price_cents": 20}
+    ], headers=headers)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    order = client.get("/order/1", headers=headers).json()
+    assert order["price_cents"] == MAX_CENTS - 10
+    assert len(order["items"]) == 1
+
+def test_price_drift_detected_and_fixed(client, db_session):
+    import asyncio
+
+    from src.infrastructure.db.models import Order
+    from src.infrastructure.db.repositories import AsyncSQLAlchemyOrderRepository
+    from tests.conftest import TestingAsyncSessionLocal
+
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    client.post(f"/order/{order_id}/items", json={
+        "amount": 2, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4500
+    }, headers=headers)
+
+    db_session.get(Order, order_id).price_cents = 1
+    db_session.commit()
+
+    async def check():
+        async with TestingAsyncSessionLocal() as session:
+            repo = AsyncSQLAlchemyOrderRepository(session)
+            drift = await repo.find_price_drift()
+            fixed = await repo.fix_price_drift()
+            return drift, fixed, await repo.find_price_drift()
+
+    drift, fixed, remaining = asyncio.run(check())
+    assert drift == [(order_id, 1, 9000)]
+    assert fixed == 1
+    assert remaining == []
+
+def test_add_order_items_batch(client, query_counter):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+
+    items = [
+        {
+            "amount": 1,
+            "flavor": f"Sabor {i}",
+            "size": "Grande",
+            "unit_price_cents": 4990
+        }
+        for i in range(20)
+    ]
+    query_counter.reset()
+    res = client.post(f"/order/{order_id}/items/batch", json=items, headers=headers)
+    assert res.status_code == status.HTTP_201_CREATED
+    order = res.json()["order"]
+    assert len(order["items"]) == 20
+    assert order["price_cents"] == 20 * 4990
+    inserts = [
+        sql for sql in query_counter.statements
+        if sql.startswith("INSERT INTO order_item")
+    ]
+    assert len(inserts) == 1
+
+    empty_res = client.post(f"/order/{order_id}/items/batch", json=[], headers=headers)
+    assert empty_res.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+def test_export_orders_streams_ndjson_and_csv(client):
+    import json
+
+    from src.domain.clock import utcnow
+    token = _create_and_login_user(client, "user@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(3):
+        create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    client.post(f"/order/{order_id}/items/batch", json=[
+        {
+            "amount": 1,
+            "flavor": "Calabresa",
+            "size": "Grande",
+            "unit_price_cents": 4990
+        },
+        {"amount": 2, "flavor": "Mussarela", "size": "Media", "unit_price_cents": 3990},
+    ], headers=headers)
+
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    res = client.get("/order/export", headers=admin_headers)
+    assert res.status_code == status.HTTP_200_OK
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    orders = [json.loads(line) for line in res.text.splitlines()]
+    assert [order["id"] for order in orders] == [1, 2, 3]
+    flavors = [item["flavor"] for item in orders[-1]["items"]]
+    assert flavors == ["Calabresa", "Mussarela"]
+    assert orders[-1]["price_cents"] == 4990 + 2 * 3990
+
+    res = client.get(
+        "/order/export",
+        params={"format": "csv", "status": "PENDING"},
+        headers=admin_headers
+    )
+    lines = res.text.splitlines()
+    assert lines[0].startswith("order_id,user_id,status")
+    assert len(lines) == 1 + 2 + 2  # header, two empty orders, two items
+
+    today = utcnow().date()
+    res = client.get(
+        "/order/export",
+        params={"start": str(today), "end": str(today)},
+        headers=admin_headers
+    )
+    assert len(res.text.splitlines()) == 3
+    res = client.get(
+        "/order/export", params={"end": "2000-01-01"}, headers=admin_headers
+    )
+    assert res.text == ""
+
+    res = client.get("/order/export", headers=headers)
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+def test_order_changes_delta_sync(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    other_token = _create_and_login_user(client, "other@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    order_ids = [
+        int(client.post("/order/", headers=headers).json()["Message"].split()[-1])
+        for _ in range(3)
+    ]
+    client.post("/order/", headers={"Authorization": f"Bearer {other_token}"})
+
+    res = client.get("/order/changes", headers=headers)
+    assert res.status_code == status.HTTP_200_OK
+    changes = res.json()
+    assert [order["id"] for order in changes["orders"]] == order_ids
+    assert changes["deleted_items"] == []
+    since = changes["next_since"]
+
+    # Nothing changed since the last poll
+    res = client.get("/order/changes", params={"since": since}, headers=headers)
+    assert res.json()["orders"] == []
+
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990
+    }
+    add_res = client.post(f"/order/{order_ids[0]}/items", json=item, headers=headers)
+    item_id = add_res.json()["order"]["items"][0]["id"]
+    client.delete(f"/order/items/{item_id}", headers=headers)
+    client.post(f"/order/{order_ids[2]}/cancel", headers=headers)
+
+    changes = client.get(
+        "/order/changes", params={"since": since}, headers=headers
+    ).json()
+    changed_ids = [order["id"] for order in changes["orders"]]
+    assert changed_ids == [order_ids[0], order_ids[2]]
+    assert changes["orders"][0]["items"] == []
+    assert changes["orders"][1]["status"] == "CANCELED"
+    tombstones = [
+        (tomb["item_id"], tomb["order_id"]) for tomb in changes["deleted_items"]
+    ]
+    assert tombstones == [(item_id, order_ids[0])]
+    assert changes["next_since"] == changes["orders"][-1]["change_seq"]
+
+    # Paging with a small limit returns every order exactly once
+    seen, since, has_more = [], 0, True
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    while has_more:
+        page = client.get(
+            "/order/changes",
+            params={"since": since, "limit": 2},
+            headers=admin_headers
+        ).json()
+        seen += [order["id"] for order in page["orders"]]
+        since, has_more = page["next_since"], page["has_more"]
+    assert sorted(seen) == [1, 2, 3, 4]
+
+def test_import_orders_reports_row_errors_without_aborting(client):
+    import json
+    _create_and_login_user(client, "user@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+
+    calabresa = {"flavor": "Calabresa", "size": "Grande"}
+    lines = [
+        {"user_id": 1, "status": "FINISHED", "items": [
+            {**calabresa, "amount": 2, "unit_price_cents": 4500},
+            {"amount": 1, "flavor": "Mussarela", "size": "Media", "unit_price": 35.5},
+        ]},
+        {"user_id": 99, "items": []},
+        {"user_id": 1, "status": "LOST"},
+        {"user_id": 2},
+        {"user_id": 1, "items": [{**calabresa, "amount": 1, "unit_price": "abc"}]},
+        # Totals that would overflow a 64-bit INTEGER
+        {"user_id": 1, "items": [
+            {**calabresa, "amount": 10**10, "unit_price_cents": 2**62},
+        ]},
+        {"user_id": 1, "items": [
+            {**calabresa, "amount": 1, "unit_price_cents": 2**62},
+            {**calabresa, "amount": 1, "unit_price_cents": 2**62},
+        ]},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+    body += b"\n{not json\n\xff\xfe\n"
+    res = client.post(
+        "/order/import",
+        params={"chunk_size": 2},
+        content=body,
+        headers=admin_headers
+    )
+    assert res.status_code == status.HTTP_200_OK
+    report = res.json()
+    assert report["imported"] == 2
+    errors = {error["line"]: error["error"] for error in report["errors"]}
+    assert sorted(errors) == [2, 3, 5, 6, 7, 8, 9]
+    assert errors[9] == "Invalid UTF-8"
+
+    orders = client.get("/order/", params={"user_id": 1}, headers=admin_headers).json()
+    assert orders[0]["status"] == "FINISHED"
+    assert orders[0]["price_cents"] == 2 * 4500 + 3550
+
+def test_import_orders_csv_round_trip(client):
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    create_res = client.post("/order/", headers=admin_headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    # A quoted CSV field spanning lines must survive the round trip
+    client.post(f"/order/{order_id}/items/batch", json=[
+        {
+            "amount": 1,
+            "flavor": "Cala\nbresa",
+            "size": "Grande",
+            "unit_price_cents": 4990
+        },
+        {"amount": 3, "flavor": "Mussarela", "size": "Media", "unit_price_cents": 3990},
+    ], headers=admin_headers)
+    client.post("/order/", headers=admin_headers)
+
+    exported = client.get(
+        "/order/export", params={"format": "csv"}, headers=admin_headers
+    ).text
+    res = client.post(
+        "/order/import",
+        params={"format": "csv"},
+        content=exported,
+        headers=admin_headers
+    )
+    assert res.json() == {"imported": 2, "errors": []}
+
+    orders = client.get("/order/", headers=admin_headers).json()
+    totals = [order["price_cents"] for order in orders]
+    assert totals == [0, 4990 + 3 * 3990, 0, 4990 + 3 * 3990]
+    flavors = [item["flavor"] for item in orders[1]["items"]]
+    assert flavors == ["Cala\nbresa", "Mussarela"]
+
+def test_import_orders_requires_admin(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    res = client.post(
+        "/order/import", content="", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+def test_order_responses_match_schema(client, db_session):
+    import json
+
+    from src.infrastructure.db.models import Order
+    from src.presentation.order_io import order_to_dict
+    from src.presentation.responses import FastJSONResponse
+    from src.presentation.schemas import ResponseOrderSchema
+
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.post("/order/", headers=headers)
+    client.post("/order/1/items/batch", json=[
+        {
+            "amount": 2,
+            "flavor": "Calabresa",
+            "size": "Grande",
+            "unit_price_cents": 4995
+        },
+        {"amount": 1, "flavor": "Mussarela", "size": "Media", "unit_price": 39.9},
+    ], headers=headers)
+
+    order = db_session.get(Order, 1)
+    expected = ResponseOrderSchema.model_validate(order).model_dump(mode="json")
+    assert json.loads(FastJSONResponse(order_to_dict(order)).body) == expected
+    assert client.get("/order/1", headers=headers).json() == expected
+
+def test_read_repository_returns_detached_entities(client):
+    import asyncio
+    import dataclasses
+
+    import pytest
+
+    from src.domain.entities import OrderEntity
+    from src.infrastructure.db.repositories import AsyncSQLAlchemyOrderReadRepository
+    from tests.conftest import TestingAsyncSessionLocal
+
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(3):
+        client.post("/order/", headers=headers)
+    client.post("/order/2/items/batch", json=[
+        {
+            "amount": 1,
+            "flavor": "Calabresa",
+            "size": "Grande",
+            "unit_price_cents": 4990
+        },
+        {"amount": 3, "flavor": "Mussarela", "size": "Media", "unit_price_cents": 3990},
+    ], headers=headers)
+
+    async def read():
+        async with TestingAsyncSessionLocal() as session:
+            repo = AsyncSQLAlchemyOrderReadRepository(session)
+            page = await repo.get_page(2, cursor=3)
+            missing = await repo.get_by_id(99)
+            return page, missing, len(session.identity_map)
+
+    page, missing, tracked = asyncio.run(read())
+    assert [order.id for order in page] == [2, 1]
+    assert all(isinstance(order, OrderEntity) for order in page)
+    assert [(item.flavor, item.total_cents) for item in page[0].items] == [
+        ("Calabresa", 4990),
+        ("Mussarela", 3 * 3990),
+    ]
+    assert page[1].items == ()
+    assert missing is None
+    assert tracked == 0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        page[0].status = "FINISHED"
+
+def test_order_endpoints_commit_once(client, query_counter):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990
+    }
+
+    def commits(method, url, **kwargs):
+        query_counter.reset()
+        res = client.request(method, url, **kwargs)
+        assert res.status_code < 400, res.text
+        return query_counter.commits
+
+    assert commits("POST", "/order/", headers=headers) == 1
+    assert commits("POST", "/order/1/items", json=item, headers=headers) == 1
+    batch = [item, item]
+    assert commits("POST", "/order/1/items/batch", json=batch, headers=headers) == 1
+    assert commits("DELETE", "/order/items/1", headers=headers) == 1
+    assert commits("POST", "/order/1/finish", headers=headers) == 1
+    assert commits("POST", "/order/1/cancel", headers=headers) == 1
+    assert commits("GET", "/order/", headers=headers) == 0
+    assert commits("GET", "/order/1", headers=headers) == 0
+    assert commits("POST", "/order/import", content='{"user_id": 1, "items": []}\n',
+                   headers={"Authorization": f"Bearer {admin_token}"}) == 1
+
+    # A failed mutation leaves nothing behind
+    query_counter.reset()
+    res = client.post("/order/1/finish", headers=headers)
+    assert res.status_code == status.HTTP_400_BAD_REQUEST
+    assert query_counter.commits == 0
+
+def test_order_writes_are_single_returning_statements(client, query_counter):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990
+    }
+
+    def order_writes(method, url, **kwargs):
+        query_counter.reset()
+        res = client.request(method, url, headers=headers, **kwargs)
+        assert res.status_code < 400, res.text
+        statements = query_counter.statements
+        writes = [
+            s for s in statements
+            if s.startswith(("INSERT INTO orders", "UPDATE orders"))
+        ]
+        # Nothing is read back after the order is written
+        last_write = statements.index(writes[-1])
+        assert not any(s.startswith("SELECT") for s in statements[last_write:])
+        return writes, res.json().get("order")
+
+    writes, _ = order_writes("POST", "/order/")
+    assert len(writes) == 1 and "RETURNING" in writes[0]
+    writes, updated = order_writes("POST", "/order/1/items", json=item)
+    assert len(writes) == 1 and "RETURNING" in writes[0]
+    assert updated["change_seq"] == 2
+
+    writes, canceled = order_writes("POST", "/order/1/cancel")
+    assert len(writes) == 1 and "RETURNING" in writes[0]
+    assert canceled["status"] == "CANCELED"
+    assert canceled["change_seq"] > updated["change_seq"]
+    assert [i["id"] for i in canceled["items"]] == [i["id"] for i in updated["items"]]
+
+def test_order_etag_and_if_match(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    headers = {"Authorization": f"Bearer {token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990
+    }
+    client.post("/order/", headers=headers)
+
+    res = client.post("/order/1/items", json=item, headers=headers)
+    assert res.headers["ETag"] == '"2"'
+    assert res.json()["order"]["version"] == 2
+
+    res = client.get("/order/1", headers=headers)
+    assert res.headers["ETag"] == '"2"'
+    res = client.get("/order/1", headers={**headers, "If-None-Match": '"2"'})
+    assert res.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # A stale version is refused and changes nothing
+    stale = {**headers, "If-Match": '"1"'}
+    res = client.post("/order/1/items", json=item, headers=stale)
+    assert res.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert len(client.get("/order/1", headers=headers).json()["items"]) == 1
+
+    current = {**headers, "If-Match": '"2"'}
+    res = client.post("/order/1/items", json=item, headers=current)
+    assert res.status_code == status.HTTP_201_CREATED
+    assert res.headers["ETag"] == '"3"'
+    res = client.post("/order/1/cancel", headers={**headers, "If-Match": 'W/"3"'})
+    assert res.status_code == status.HTTP_200_OK
+    assert res.json()["order"]["version"] == 4
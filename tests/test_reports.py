@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import status
+
+from src.config import settings
+from src.domain import clock, use_cases
+from src.infrastructure.db.repositories import AsyncSQLAlchemySalesReportRepository
+from tests.conftest import TestingAsyncSessionLocal
+from tests.test_orders import _create_and_login_user
+
+
+def _order_with_items(client, headers, items):
+    create_res = client.post("/order/", headers=headers)
+    order_id = int(create_res.json()["Message"].split()[-1])
+    client.post(f"/order/{order_id}/items/batch", json=items, headers=headers)
+    return order_id
+
+def _reports(client, headers):
+    return {
+        "revenue": client.get("/reports/revenue", headers=headers).json(),
+        "flavors": client.get("/reports/top-flavors", headers=headers).json(),
+        "sizes": client.get("/reports/sizes", headers=headers).json(),
+        "statuses": client.get("/reports/statuses", headers=headers).json(),
+    }
+
+def test_rollups_follow_finish_and_cancel(client):
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    calabresa = {
+        "amount": 2, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 5000
+    }
+    mussarela = {
+        "amount": 1, "flavor": "Mussarela", "size": "Media", "unit_price_cents": 4000
+    }
+
+    first = _order_with_items(client, headers, [calabresa, mussarela])
+    second = _order_with_items(client, headers, [mussarela])
+    third = _order_with_items(client, headers, [calabresa])
+    for order_id in (first, second, third):
+        client.post(f"/order/{order_id}/finish", headers=headers)
+    # Canceling a finished order moves it to the CANCELED rollup
+    client.post(f"/order/{third}/cancel", headers=headers)
+
+    reports = _reports(client, headers)
+    assert reports["revenue"]["order_count"] == 2
+    assert reports["revenue"]["revenue_cents"] == 14000 + 4000
+    flavors = reports["flavors"]
+    assert [(f["flavor"], f["quantity"], f["revenue_cents"]) for f in flavors] == [
+        ("Calabresa", 2, 10000),
+        ("Mussarela", 2, 8000),
+    ]
+    sizes = {s["size"]: s["quantity"] for s in reports["sizes"]}
+    assert sizes == {"Grande": 2, "Media": 2}
+    statuses = {s["status"]: s["order_count"] for s in reports["statuses"]}
+    assert statuses == {"CANCELED": 1, "FINISHED": 2}
+
+    # A full rebuild from history produces the same rollups
+    async def rebuild():
+        async with TestingAsyncSessionLocal() as session:
+            return await AsyncSQLAlchemySalesReportRepository(session).rebuild()
+
+    assert asyncio.run(rebuild()) == (3, 0)
+    assert _reports(client, headers) == reports
+
+def test_items_of_closed_orders_are_frozen(client):
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 1000
+    }
+    extra = {**item, "unit_price_cents": 5000}
+
+    finished = _order_with_items(client, headers, [item])
+    client.post(f"/order/{finished}/finish", headers=headers)
+    canceled = _order_with_items(client, headers, [item])
+    client.post(f"/order/{canceled}/cancel", headers=headers)
+    reports = _reports(client, headers)
+
+    for order_id in (finished, canceled):
+        order = client.get(f"/order/{order_id}", headers=headers).json()
+        item_id = order["items"][0]["id"]
+        url = f"/order/{order_id}/items"
+        responses = [
+            client.post(url, json=extra, headers=headers),
+            client.post(f"{url}/batch", json=[extra], headers=headers),
+            client.delete(f"/order/items/{item_id}", headers=headers),
+        ]
+        codes = [res.status_code for res in responses]
+        assert codes == [status.HTTP_400_BAD_REQUEST] * 3
+    assert reports["revenue"]["revenue_cents"] == 1000
+
+    async def rebuild():
+        async with TestingAsyncSessionLocal() as session:
+            return await AsyncSQLAlchemySalesReportRepository(session).rebuild()
+
+    # The incrementally maintained rollups still match a rebuild from history
+    assert asyncio.run(rebuild()) == (2, 0)
+    assert _reports(client, headers) == reports
+
+def test_reports_require_admin(client):
+    token = _create_and_login_user(client, "user@example.com", "password")
+    res = client.get("/reports/revenue", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == status.HTTP_403_FORBIDDEN
+
+def test_rollups_bucket_by_business_day(client, monkeypatch):
+    admin_token = _create_and_login_user(
+        client, "admin@example.com", "password", admin=True
+    )
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    item = {
+        "amount": 1, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 1000
+    }
+    # 01:30 UTC on the 17th is still 22:30 on the 16th in Sao Paulo (UTC-3)
+    monkeypatch.setattr(settings, "BUSINESS_TIMEZONE", "America/Sao_Paulo")
+    def now():
+        return datetime(2026, 10, 17, 1, 30)
+
+    monkeypatch.setattr(clock, "utcnow", now)
+    monkeypatch.setattr(use_cases, "utcnow", now)
+
+    order_id = _order_with_items(client, headers, [item])
+    client.post(f"/order/{order_id}/finish", headers=headers)
+
+    # The default range ends today in the business time zone
+    revenue = client.get("/reports/revenue", headers=headers).json()
+    assert revenue["end"] == "2026-10-16"
+    assert [day["day"] for day in revenue["days"]] == ["2026-10-16"]
+
+    async def rebuild():
+        async with TestingAsyncSessionLocal() as session:
+            repo = AsyncSQLAlchemySalesReportRepository(session)
+            result = await repo.rebuild()
+            await session.commit()
+            return result
+
+    assert asyncio.run(rebuild()) == (1, 0)
+    assert client.get("/reports/revenue", headers=headers).json() == revenue
@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, update
+
+from src.dependencies import build_order_use_case
+from src.infrastructure.db.models import Order, User
+from src.infrastructure.db.repositories import AsyncSQLAlchemyOrderRepository
+from src.infrastructure.db.write_queue import DirectWriter, GroupCommitWriter
+from src.infrastructure.events import OrderEventBus
+from tests.conftest import TestingAsyncSessionLocal
+
+ITEM = {"amount": 2, "flavor": "Calabresa", "size": "Grande", "unit_price_cents": 4990}
+
+
+@pytest.fixture
+def user(db_session):
+    user = User(name="Writer", email="writer@example.com", password="hashed")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    db_session.expunge(user)
+    return user
+
+def _writer(bus, window=0.05):
+    return GroupCommitWriter(
+        TestingAsyncSessionLocal, build_order_use_case, bus,
+        window=window, max_batch=64
+    )
+
+def test_group_commit_coalesces_concurrent_writes(user, query_counter):
+    bus = OrderEventBus(history_size=100, queue_size=100)
+    writer = _writer(bus)
+
+    async def run():
+        order = await writer.submit(lambda orders: orders.create_order(user.id))
+        query_counter.reset()
+        added = await asyncio.gather(*[
+            writer.submit(lambda orders: orders.add_item(order.id, user=user, **ITEM))
+            for _ in range(10)
+        ])
+        return order, added
+
+    order, added = asyncio.run(run())
+    assert query_counter.commits == 1
+    assert query_counter.statements.count("BEGIN IMMEDIATE") == 1
+    # Every caller sees the order as of its own job
+    assert sorted(len(result.items) for result in added) == list(range(1, 11))
+    assert max(result.price_cents for result in added) == 10 * 2 * 4990
+    assert [event.type for event in bus._history] == ["created"] + ["item_added"] * 10
+
+def test_group_commit_isolates_failing_jobs(user, db_session, query_counter):
+    bus = OrderEventBus(history_size=100, queue_size=100)
+    writer = _writer(bus)
+
+    async def create_then_fail(orders):
+        await orders.create_order(user.id)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            writer.submit(lambda orders: orders.create_order(user.id)),
+            writer.submit(create_then_fail),
+            writer.submit(lambda orders: orders.cancel_order(999, user)),
+            writer.submit(lambda orders: orders.create_order(user.id)),
+            return_exceptions=True
+        )
+
+    first, failed, missing, last = asyncio.run(run())
+    assert isinstance(failed, RuntimeError)
+    assert isinstance(missing, LookupError)
+    assert query_counter.commits == 1
+    # The failed job's order was rolled back with its savepoint
+    assert db_session.scalar(select(func.count()).select_from(Order)) == 2
+    assert {first.id, last.id} == set(db_session.scalars(select(Order.id)))
+    assert [event.order_id for event in bus._history] == [first.id, last.id]
+
+def test_group_commit_rolls_back_when_every_job_fails(user, query_counter):
+    writer = _writer(OrderEventBus(history_size=10, queue_size=10), window=0)
+
+    async def run():
+        return await asyncio.gather(
+            writer.submit(lambda orders: orders.cancel_order(999, user)),
+            writer.submit(lambda orders: orders.finalize_order(998, user)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, LookupError) for result in results)
+    assert query_counter.commits == 0
+
+def test_mutation_retries_after_concurrent_update(user, db_session, monkeypatch):
+    bus = OrderEventBus(history_size=10, queue_size=10)
+    writer = DirectWriter(TestingAsyncSessionLocal, build_order_use_case, bus)
+    order = asyncio.run(writer.submit(lambda orders: orders.create_order(user.id)))
+    loads = []
+    get_by_id = AsyncSQLAlchemyOrderRepository.get_by_id
+
+    async def load_then_race(self, order_id):
+        loaded = await get_by_id(self, order_id)
+        loads.append(loaded.version)
+        if len(loads) == 1:
+            # Another writer changes the order between this read and the UPDATE
+            db_session.execute(
+                update(Order)
+                .where(Order.id == order_id)
+                .values(version=Order.version + 1)
+            )
+            db_session.commit()
+        return loaded
+
+    monkeypatch.setattr(AsyncSQLAlchemyOrderRepository, "get_by_id", load_then_race)
+    updated = asyncio.run(writer.submit(
+        lambda orders: orders.add_item(order.id, user=user, **ITEM)
+    ))
+    assert loads == [1, 2]
+    assert updated.version == 3
+    assert updated.price_cents == 2 * 4990
+    assert len(updated.items) == 1